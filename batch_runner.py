@@ -0,0 +1,240 @@
+import argparse
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pipeline import score_company, forecast_company, build_report
+
+
+CHECKPOINT_FILE = "_checkpoint.jsonl"
+
+
+# ------------------- Input streaming -------------------
+
+def iter_companies(file_path, company_column="Company", chunksize=100000):
+    """Yield (company, DataFrame) pairs from a CSV without loading it whole.
+
+    Rows of one company must be contiguous (e.g. the file is sorted by
+    company). A file without the company column is treated as a single
+    company named after the file.
+    """
+    pending = None
+
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+
+        if company_column not in chunk.columns:
+            company = os.path.splitext(os.path.basename(file_path))[0]
+            pending = chunk if pending is None else pd.concat([pending, chunk], ignore_index=True)
+            pending[company_column] = company
+            continue
+
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+
+        # The last company may continue in the next chunk; hold it back
+        last = chunk[company_column].iloc[-1]
+        tail = chunk[company_column] == last
+        pending = chunk[tail]
+
+        for company, rows in chunk[~tail].groupby(company_column, sort=False):
+            yield company, rows.reset_index(drop=True)
+
+    if pending is not None and len(pending):
+        yield pending[company_column].iloc[0], pending.reset_index(drop=True)
+
+
+def iter_batches(companies, batch_size, done):
+    batch = []
+    for company, rows in companies:
+        if str(company) in done:
+            continue
+        batch.append((company, rows))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ------------------- Jobs -------------------
+
+def _flatten(result):
+    return {key: "; ".join(value) if isinstance(value, list) else value
+            for key, value in result.items()}
+
+
+def per_company(func):
+    """Turn a failure for one company into an `error` value in its row.
+
+    Without this one bad company (e.g. NaN revenue rejected by the forecast
+    model) would abort the whole batch, and every resume would fail again
+    on the same batch. Successful rows carry error=None so every part has
+    the same columns.
+    """
+    @functools.wraps(func)
+    def wrapper(job):
+        try:
+            return {**func(job), "error": None}
+        except Exception as e:
+            return {"company": job[0], "error": f"{type(e).__name__}: {e}"}
+    return wrapper
+
+
+@per_company
+def score_job(job):
+    company, data, _ = job
+    return {"company": company, **_flatten(score_company(data))}
+
+
+@per_company
+def forecast_job(job):
+    company, data, _ = job
+    return {"company": company, **forecast_company(data)}
+
+
+@per_company
+def report_job(job):
+    company, data, output_dir = job
+    filename = os.path.join(output_dir, f"{company}_Financial_Report.pdf")
+    return {"company": company, "report": build_report(data, filename)}
+
+
+JOBS = {
+    "score": score_job,
+    "forecast": forecast_job,
+    "report": report_job,
+}
+
+
+# ------------------- Checkpointing -------------------
+
+class Checkpoint:
+    """Append-only log of finished output parts and the companies in them."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CHECKPOINT_FILE)
+        self.parts = []
+        self.done = set()
+
+        if os.path.exists(self.path):
+            self._load()
+
+    def _load(self):
+        valid = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                # A torn last line means the run died mid-write
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self.parts.append(entry["part"])
+                self.done.update(entry["companies"])
+                valid += len(line)
+
+        # Cut the torn tail so the next record() starts on a fresh line
+        if valid < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def discard_orphans(self):
+        # Parts written after the last checkpoint entry are rebuilt on resume
+        for name in os.listdir(self.output_dir):
+            if name.startswith("part-") and name not in self.parts:
+                os.remove(os.path.join(self.output_dir, name))
+
+    def next_index(self):
+        # One past the highest part recorded or on disk, so no part name is reused
+        names = set(self.parts) | {n for n in os.listdir(self.output_dir) if n.startswith("part-")}
+        numbers = [int(n[5:10]) for n in names if n[5:10].isdigit()]
+        return max(numbers, default=-1) + 1
+
+    def record(self, part, companies):
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"part": part, "companies": companies}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.parts.append(part)
+        self.done.update(companies)
+
+
+def write_part(rows, output_dir, index, fmt):
+    part = f"part-{index:05d}.{fmt}"
+    path = os.path.join(output_dir, part)
+    tmp = path + ".tmp"
+
+    frame = pd.DataFrame(rows)
+    if fmt == "parquet":
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+
+    os.replace(tmp, path)
+    return part
+
+
+# ------------------- Runner -------------------
+
+def run(command, input_path, output_dir, workers=None, batch_size=500,
+        chunksize=100000, company_column="Company", fmt="csv"):
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    checkpoint = Checkpoint(output_dir)
+    checkpoint.discard_orphans()
+
+    if checkpoint.done:
+        print(f"Resuming: {len(checkpoint.done)} companies already processed.")
+
+    job = JOBS[command]
+    companies = iter_companies(input_path, company_column, chunksize)
+    index = checkpoint.next_index()
+    processed = failed = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in iter_batches(companies, batch_size, checkpoint.done):
+
+            jobs = [(company, rows, output_dir) for company, rows in batch]
+            results = list(pool.map(job, jobs, chunksize=8))
+
+            part = write_part(results, output_dir, index, fmt)
+            checkpoint.record(part, [str(company) for company, _ in batch])
+
+            index += 1
+            processed += len(batch)
+            failed += sum(1 for r in results if r["error"] is not None)
+            print(f"{part}: {len(batch)} companies ({processed} this run)")
+
+    print(f"Done. {len(checkpoint.done)} companies in {output_dir}")
+    if failed:
+        print(f"{failed} companies failed this run; see the error column in the parts.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scoring, forecasting and reporting for SME portfolios")
+    parser.add_argument("command", choices=sorted(JOBS))
+    parser.add_argument("--input", default="dataset/sme_financial_data.csv")
+    parser.add_argument("--output", default="batch_output")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Companies per output part / checkpoint")
+    parser.add_argument("--chunksize", type=int, default=100000,
+                        help="CSV rows read per chunk")
+    parser.add_argument("--company-column", default="Company")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+
+    run(args.command, args.input, args.output, args.workers, args.batch_size,
+        args.chunksize, args.company_column, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_data import generate_sme_data
+from data_loader import DataLoader
+from risk_detection import RiskDetector
+from health_score import HealthScoreCalculator
+from forecasting_model import ForecastingModel
+from scenario_simulator import ScenarioSimulator
+from peer_benchmark import PeerBenchmarkIndex
+from pipeline import build_report, score_company
+from report_generator import clear_report_cache
+
+
+BASELINE_FILE = "benchmark_baseline.json"
+
+DEFAULT_ROWS = [1000, 100000, 1000000, 10000000]
+DEFAULT_COMPANIES = [1, 100, 1000, 100000]
+
+RISK_METHODS = [
+    "rule_based_risk",
+    "ml_risk_score",
+    "final_risk_level",
+    "risk_explanation",
+    "recommendations",
+    "investor_score",
+    "loan_eligibility",
+    "bankruptcy_risk",
+    "fraud_detection",
+]
+
+
+# ------------------- Benchmarks -------------------
+# Each benchmark gets a prepared context and returns the callable to time.
+# "max_rows" keeps inherently per-row work (plotting, PDF) at sane sizes and
+# "max_companies" does the same for per-company loops, so the default grid
+# stays usable as a --compare regression gate.
+
+def _risk_benchmark(method):
+    def setup(ctx):
+        return getattr(RiskDetector(ctx.frame), method)
+    return setup
+
+
+def _health(ctx):
+    return HealthScoreCalculator(ctx.frame).calculate_score
+
+
+def _forecast(ctx):
+    return ForecastingModel(ctx.frame).predict_next_month
+
+
+def _scenario(ctx):
+    return ScenarioSimulator(ctx.frame, n_paths=10000, horizon=12, seed=0).simulate
+
+
+def _load_data(ctx):
+    loader = DataLoader(ctx.csv_path())
+
+    def load():
+        # load_data reports progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader.load_data()
+    return load
+
+
+def _pdf_report(ctx):
+    frame = ctx.frame
+    filename = os.path.join(ctx.scratch, "benchmark_report.pdf")
+
+    def cold():
+        clear_report_cache()
+        build_report(frame, filename)
+    return cold
+
+
+def _pdf_report_cached(ctx):
+    frame = ctx.frame
+    filename = os.path.join(ctx.scratch, "benchmark_report.pdf")
+    build_report(frame, filename)
+    return lambda: build_report(frame, filename)
+
+
+def _portfolio_score(ctx):
+    groups = [rows for _, rows in ctx.portfolio.groupby("Company", sort=False)]
+    return lambda: [score_company(rows) for rows in groups]
+
+
+def _portfolio_peer_index(ctx):
+    # Whole-portfolio pass that stays usable at 100000 companies
+    portfolio = ctx.portfolio
+    return lambda: PeerBenchmarkIndex.build(portfolio)
+
+
+BENCHMARKS = {f"RiskDetector.{m}": {"setup": _risk_benchmark(m)} for m in RISK_METHODS}
+BENCHMARKS.update({
+    "HealthScoreCalculator.calculate_score": {"setup": _health},
+    "ForecastingModel.predict_next_month": {"setup": _forecast},
+    "ScenarioSimulator.simulate": {"setup": _scenario},
+    "DataLoader.load_data": {"setup": _load_data, "max_rows": 1000000},
+    "generate_pdf_report": {"setup": _pdf_report, "max_rows": 1000},
+    "generate_pdf_report.cached": {"setup": _pdf_report_cached, "max_rows": 1000},
+    "portfolio.score_company": {"setup": _portfolio_score, "portfolio": True, "max_rows": 1000000,
+                                "max_companies": 1000},
+    "portfolio.peer_index": {"setup": _portfolio_peer_index, "portfolio": True, "max_rows": 1000000},
+})
+
+
+class Context:
+    """Synthetic data for one (rows, companies) point, built lazily."""
+
+    def __init__(self, rows, companies, scratch):
+        self.rows = rows
+        self.companies = companies
+        self.scratch = scratch
+        self._frame = None
+        self._portfolio = None
+        self._csv = None
+
+    @property
+    def frame(self):
+        # Single-company DataFrame with the dashboard's derived columns
+        if self._frame is None:
+            self._frame = generate_sme_data(self.rows, 1)
+            self._frame["Profit"] = self._frame["Revenue"] - self._frame["Expenses"]
+            self._frame["Cash Flow"] = self._frame["Revenue"] - (
+                self._frame["Expenses"] + self._frame["Loan EMI"] + self._frame["Tax Paid"])
+        return self._frame
+
+    @property
+    def portfolio(self):
+        if self._portfolio is None:
+            self._portfolio = generate_sme_data(self.rows, self.companies)
+        return self._portfolio
+
+    def csv_path(self):
+        if self._csv is None:
+            self._csv = os.path.join(self.scratch, f"sme_{self.rows}.csv")
+            generate_sme_data(self.rows, 1).to_csv(self._csv, index=False)
+        return self._csv
+
+
+# ------------------- Measurement -------------------
+
+def measure(func, repeat, min_time=0.2):
+    # Calibrate the loop count so each sample runs for at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1000:
+            break
+        number *= 10
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    # Peak memory is measured on a separate call; tracemalloc slows the timed runs
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "peak_mb": round(peak / 1e6, 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_suite(rows_list, companies_list, selected=None, repeat=5, quiet=False):
+    results = {}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for rows in rows_list:
+            for companies in companies_list:
+                if companies > rows:
+                    continue
+                ctx = Context(rows, companies, scratch)
+
+                for name, spec in BENCHMARKS.items():
+                    if selected and not any(s in name for s in selected):
+                        continue
+                    if rows > spec.get("max_rows", rows):
+                        continue
+                    if companies > spec.get("max_companies", companies):
+                        continue
+                    # Single-company benchmarks only run once per row count
+                    if spec.get("portfolio", False) != (companies > 1):
+                        continue
+
+                    key = f"{name}[rows={rows},companies={companies}]"
+                    results[key] = measure(spec["setup"](ctx), repeat)
+
+                    if not quiet:
+                        r = results[key]
+                        print(f"{key:<75} {r['median_s'] * 1000:>12.3f} ms  {r['peak_mb']:>10.2f} MB")
+
+    return results
+
+
+# ------------------- Baselines -------------------
+
+def save_baseline(results, path):
+    with open(path, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+    print(f"Baseline saved to {path}")
+
+
+def compare_baseline(results, path, time_tolerance=0.25, memory_tolerance=0.25):
+    with open(path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    for key, current in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]
+
+        time_ratio = current["median_s"] / before["median_s"] if before["median_s"] else 1.0
+        memory_ratio = current["peak_mb"] / before["peak_mb"] if before["peak_mb"] else 1.0
+
+        if time_ratio > 1 + time_tolerance:
+            regressions.append(f"{key}: time {time_ratio:.2f}x baseline")
+        if memory_ratio > 1 + memory_tolerance:
+            regressions.append(f"{key}: peak memory {memory_ratio:.2f}x baseline")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the SME analytics pipeline")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--companies", type=int, nargs="+", default=DEFAULT_COMPANIES)
+    parser.add_argument("--bench", nargs="+", help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail if results regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # No baseline is committed: record one on this machine first
+    if args.compare and not args.save and not os.path.exists(args.baseline):
+        raise SystemExit(f"No benchmark baseline at {args.baseline}. "
+                         f"Run with --save on this machine first, then use --compare.")
+
+    results = run_suite(args.rows, args.companies, args.bench, args.repeat)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+
+    if args.compare:
+        regressions = compare_baseline(results, args.baseline, args.tolerance, args.tolerance)
+        if regressions:
+            print("\nRegressions detected:")
+            for r in regressions:
+                print(" -", r)
+            raise SystemExit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
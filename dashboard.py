@@ -1,3 +1,5 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -6,12 +8,27 @@ from datetime import datetime
 from risk_detection import RiskDetector
 from final_detection import FinalFinancialAdvisor
 from report_generator import generate_pdf_report
+from scenario_simulator import ScenarioSimulator
+from working_capital import iter_working_capital
+from ledger import with_derived_columns, as_frame
+import instrumentation
+from instrumentation import stage_timer
 
 
 # ------------------- Page Config -------------------
 st.set_page_config(page_title="AI Financial Health SME", layout="wide")
 
 
+# ------------------- Instrumentation -------------------
+# Stage timings for this browser session are collected in a session-local recorder
+instrumentation.enable()
+
+if "stage_recorder" not in st.session_state:
+    st.session_state["stage_recorder"] = instrumentation.Recorder()
+
+instrumentation.set_recorder(st.session_state["stage_recorder"])
+
+
 # ------------------- CUSTOM CSS (PRO UI) -------------------
 st.markdown("""
 <style>
@@ -97,17 +114,33 @@ st.markdown("<div class='subtitle-text'>Smart Financial Analytics • Risk Detec
 
 
 # ------------------- Load Dataset -------------------
+# With SME_SHARED_DATASET set, every Streamlit worker attaches read-only to the
+# copy published by `python -m shared_dataset` instead of reading its own
+SHARED_DATASET = os.getenv("SME_SHARED_DATASET")
+
+
 @st.cache_data
 def load_data():
-    df = pd.read_csv("dataset/sme_financial_data.csv")
+    with stage_timer("dashboard.load_data"):
+        df = pd.read_csv("dataset/sme_financial_data.csv")
     return df
 
 
-data = load_data()
+@st.cache_resource
+def attach_shared_data(name):
+    from shared_dataset import attach
+    return attach(name)
+
 
-# Derived metrics
-data["Profit"] = data["Revenue"] - data["Expenses"]
-data["Cash Flow"] = data["Revenue"] - (data["Expenses"] + data["Loan EMI"] + data["Tax Paid"])
+if SHARED_DATASET:
+    # current() switches to a newly published version on the next rerun
+    with stage_timer("dashboard.load_data"):
+        data = attach_shared_data(SHARED_DATASET).current()
+else:
+    data = load_data()
+
+# Derived metrics (Profit, Cash Flow)
+data = with_derived_columns(data)
 
 
 # ------------------- SIDEBAR -------------------
@@ -115,7 +148,7 @@ st.sidebar.title("⚙ Dashboard Settings")
 
 company_name = st.sidebar.text_input("Company Name", "SME Business")
 selected_month = st.sidebar.selectbox("Select Month", data["Month"].unique())
-month_data = data[data["Month"] == selected_month].iloc[0]
+month_data = as_frame(data[data["Month"] == selected_month]).iloc[0]
 
 
 st.sidebar.markdown("---")
@@ -252,6 +285,21 @@ with tab1:
     ax4.grid(True, alpha=0.3)
     st.pyplot(fig4)
 
+    st.markdown("<div class='section-title'>🔄 Working Capital Cycle (3-Month Rolling)</div>", unsafe_allow_html=True)
+
+    working_capital = pd.concat(iter_working_capital([data]), ignore_index=True)
+
+    fig_wc, ax_wc = plt.subplots()
+    ax_wc.plot(working_capital["Month"], working_capital["DSO_rolling"], marker="o", label="DSO")
+    ax_wc.plot(working_capital["Month"], working_capital["DIO_rolling"], marker="o", label="DIO")
+    ax_wc.plot(working_capital["Month"], working_capital["DPO_rolling"], marker="o", label="DPO")
+    ax_wc.plot(working_capital["Month"], working_capital["CCC_rolling"], marker="o", linewidth=2.5, label="Cash Conversion Cycle")
+    ax_wc.set_xlabel("Month")
+    ax_wc.set_ylabel("Days")
+    ax_wc.legend()
+    ax_wc.grid(True, alpha=0.3)
+    st.pyplot(fig_wc)
+
 
 # ------------------- TAB 2 : RISK ANALYSIS -------------------
 with tab2:
@@ -325,6 +373,44 @@ with tab3:
     else:
         st.error(investor_result)
 
+    st.markdown("<div class='section-title'>🎲 What-if Scenario Simulator</div>", unsafe_allow_html=True)
+
+    sc1, sc2, sc3, sc4 = st.columns(4)
+    with sc1:
+        revenue_shock = st.slider("Revenue change (%)", -50, 50, 0, step=5)
+    with sc2:
+        expense_shock = st.slider("Expense change (%)", -50, 50, 0, step=5)
+    with sc3:
+        emi_change = st.slider("Loan EMI change (%)", -50, 100, 0, step=5)
+    with sc4:
+        horizon = st.slider("Horizon (months)", 3, 36, 12)
+
+    # Fixed seed: the same slider inputs always give the same results on rerun
+    simulator = ScenarioSimulator(data, n_paths=10000, horizon=horizon, seed=0)
+    try:
+        scenario = simulator.simulate(
+            revenue_shock=revenue_shock / 100,
+            expense_shock=expense_shock / 100,
+            emi_change=emi_change / 100
+        )
+    except ValueError as e:
+        scenario = None
+        st.warning(f"⚠ {e}")
+
+    if scenario is not None:
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Median Runway (months)", f"{scenario['median_runway']:.0f} / {horizon}")
+        m2.metric("Probability of Negative Cash Flow", f"{scenario['prob_negative_cash_flow']:.1%}")
+        m3.metric("Survival Probability", f"{scenario['survival_probability']:.1%}")
+
+        fig6, ax6 = plt.subplots()
+        ax6.bar(list(scenario["bankruptcy_risk"].keys()), list(scenario["bankruptcy_risk"].values()))
+        ax6.set_ylim(0, 1)
+        ax6.set_ylabel("Share of Simulated Paths")
+        ax6.tick_params(axis="x", labelsize=8)
+        ax6.grid(True, axis="y", alpha=0.3)
+        st.pyplot(fig6)
+
 
 # ------------------- TAB 4 : AI ADVISOR -------------------
 with tab4:
@@ -347,8 +433,10 @@ with tab4:
 with tab5:
     st.markdown("<div class='section-title'>📄 Generate Financial Report (PDF)</div>", unsafe_allow_html=True)
 
+    include_history = st.checkbox("Include full financial history appendix", value=False)
+
     if st.button("📌 Generate PDF Report"):
-        file_name = generate_pdf_report(data, risk)
+        file_name = generate_pdf_report(data, risk, include_history=include_history)
 
         with open(file_name, "rb") as f:
             st.download_button(
@@ -364,12 +452,52 @@ with tab5:
 
     st.markdown("<div class='section-title'>📌 SME Financial Dataset</div>", unsafe_allow_html=True)
 
-    st.dataframe(data, use_container_width=True)
+    st.dataframe(as_frame(data), use_container_width=True)
 
     st.markdown("<div class='section-title'>📌 Selected Month Details</div>", unsafe_allow_html=True)
 
     selected_data = data[data["Month"] == selected_month]
-    st.table(selected_data)
+    st.table(as_frame(selected_data))
+
+
+# ------------------- PIPELINE LATENCIES -------------------
+with st.expander("⏱ Pipeline Latencies (this session)"):
+    session_recorder = st.session_state["stage_recorder"]
+    stats = session_recorder.snapshot()["stages"]
+
+    if stats:
+        latency_table = pd.DataFrame([
+            {
+                "Stage": stage,
+                "Calls": s["count"],
+                "Mean (ms)": round(s["mean_s"] * 1000, 2),
+                "Max (ms)": round(s["max_s"] * 1000, 2),
+                "Last (ms)": round(s["last_s"] * 1000, 2),
+                "Total (ms)": round(s["total_s"] * 1000, 2),
+            }
+            for stage, s in stats.items()
+        ]).sort_values("Total (ms)", ascending=False)
+
+        st.dataframe(latency_table, use_container_width=True, hide_index=True)
+
+        # Stages picked with SME_PROFILE=<stage>[,<stage>...] also keep their last cProfile report
+        profiles = session_recorder.snapshot()["profiles"]
+        if profiles:
+            profiled_stage = st.selectbox("Profiled stage", sorted(profiles))
+            st.code(profiles[profiled_stage]["profile"], language="text")
+
+        col_json, col_prom, col_reset = st.columns(3)
+        with col_json:
+            st.download_button("📥 Export JSON", instrumentation.export_json(session_recorder),
+                               file_name="pipeline_latencies.json", mime="application/json")
+        with col_prom:
+            st.download_button("📥 Export Prometheus", instrumentation.export_prometheus(session_recorder),
+                               file_name="pipeline_latencies.prom", mime="text/plain")
+        with col_reset:
+            if st.button("🔄 Reset Timings"):
+                session_recorder.reset()
+    else:
+        st.write("No stages recorded yet.")
 
 
 # ------------------- FOOTER -------------------
@@ -1,18 +1,44 @@
 import pandas as pd
 
+from instrumentation import timed
+from ledger import Ledger
+
 class DataLoader:
-    def __init__(self, file_path):
+    def __init__(self, file_path, compact=False, shared_name=None):
         self.file_path = file_path
+        self.compact = compact
+        self.shared_name = shared_name
+        self.shared = None
         self.data = None
 
+    @timed()
     def load_data(self):
         try:
+            if self.shared_name:
+                # Zero-copy view of the dataset published by shared_dataset.py
+                from shared_dataset import attach
+                print(f"Attaching to shared dataset: {self.shared_name}")
+                self.shared = attach(self.shared_name)
+                self.data = self.shared.current()
+                print(f"Shared dataset v{self.shared.version} attached.")
+                return
+
             print(f"Trying to load file from: {self.file_path}")
-            self.data = pd.read_csv(self.file_path)
+            if self.compact:
+                self.data = Ledger.from_csv(self.file_path)
+            else:
+                self.data = pd.read_csv(self.file_path)
             print("Data loaded successfully.")
         except Exception as e:
             print("Error loading data:", e)
 
+    def refresh(self):
+        # Pick up a newly published version of a shared dataset
+        if self.shared is not None and self.shared.refresh():
+            self.data = self.shared.ledger
+            return True
+        return False
+
     def validate_data(self):
         required_columns = [
             "Revenue",
@@ -0,0 +1,219 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import increment, stage_timer
+from ledger import Ledger
+from risk_detection import RiskDetector, risk_level
+from health_score import HealthScoreCalculator
+from forecasting_model import ForecastingModel
+from working_capital import working_capital_metrics
+
+
+class Artifact:
+
+    def __init__(self, name, compute, columns=(), depends_on=()):
+        self.name = name
+        self.compute = compute
+        self.columns = list(columns)
+        self.depends_on = list(depends_on)
+
+
+class ArtifactGraph:
+    """Recompute derived artifacts only where their input data changed.
+
+    Each artifact declares the input columns it reads and the artifacts it
+    builds on. On update() every company's columns are fingerprinted in
+    blocks of `month_range` months; an artifact is recomputed for a company
+    only if one of its columns changed there (or an upstream artifact was
+    recomputed). A corrected Tax Paid value for one company therefore
+    recomputes just cash_flow and fraud_detection for that company.
+    """
+
+    def __init__(self, company_column="Company", month_range=12):
+        self.company_column = company_column
+        self.month_range = month_range
+
+        self.artifacts = {}
+        self._order = []
+
+        self._fingerprints = {}
+        self.results = {}
+        self.last_changes = {}
+
+    # ------------------- Graph definition -------------------
+
+    def add(self, name, compute, columns=(), depends_on=()):
+        for upstream in depends_on:
+            if upstream not in self.artifacts:
+                raise ValueError(f"Artifact '{name}' depends on unknown artifact '{upstream}'")
+        self.artifacts[name] = Artifact(name, compute, columns, depends_on)
+        # Artifacts can only depend on ones added before them, so insertion
+        # order is already a topological order
+        self._order.append(name)
+        return self
+
+    def dependents(self, names):
+        """`names` plus every artifact downstream of them."""
+        affected = set(names)
+        for name in self._order:
+            if any(upstream in affected for upstream in self.artifacts[name].depends_on):
+                affected.add(name)
+        return affected
+
+    def invalidated_by(self, columns):
+        columns = set(columns)
+        direct = {name for name, a in self.artifacts.items() if columns & set(a.columns)}
+        return self.dependents(direct)
+
+    # ------------------- Fingerprinting -------------------
+
+    def _input_columns(self, data):
+        wanted = {col for a in self.artifacts.values() for col in a.columns}
+        return [col for col in data.columns if col in wanted]
+
+    def _company_positions(self, data):
+        if self.company_column not in data.columns:
+            return {None: np.arange(len(data))}
+        keys = pd.Series(np.asarray(data[self.company_column], dtype=object))
+        return keys.groupby(keys, sort=False).indices
+
+    def _fingerprint(self, row_hashes, positions):
+        # {(column, block): digest}; block b covers rows [b * month_range, (b + 1) * month_range)
+        fingerprints = {}
+        for col, hashes in row_hashes.items():
+            company_hashes = hashes[positions]
+            for block, start in enumerate(range(0, len(positions), self.month_range)):
+                chunk = company_hashes[start:start + self.month_range]
+                fingerprints[(col, block)] = hashlib.blake2b(chunk.tobytes(), digest_size=16).digest()
+        return fingerprints
+
+    def _month_label(self, months, positions, block):
+        rows = positions[block * self.month_range:(block + 1) * self.month_range]
+        if months is None or len(rows) == 0:
+            return block
+        return (months[rows[0]], months[rows[-1]])
+
+    # ------------------- Update -------------------
+
+    def update(self, data):
+        """Bring all artifacts up to date with `data` (DataFrame or Ledger).
+
+        Returns {company: set of recomputed artifact names} for companies where
+        anything was recomputed.
+        """
+        columns = self._input_columns(data)
+
+        with stage_timer("dependency_graph.fingerprint"):
+            row_hashes = {
+                col: pd.util.hash_pandas_object(pd.Series(np.asarray(data[col])), index=False).to_numpy()
+                for col in columns
+            }
+            positions_by_company = self._company_positions(data)
+
+        months = np.asarray(data["Month"], dtype=object) if "Month" in data.columns else None
+
+        recomputed = {}
+        for company, positions in positions_by_company.items():
+            fingerprints = self._fingerprint(row_hashes, positions)
+            previous = self._fingerprints.get(company, {})
+
+            changed = {key for key in fingerprints.keys() | previous.keys()
+                       if fingerprints.get(key) != previous.get(key)}
+
+            self.last_changes[company] = sorted(
+                (col, self._month_label(months, positions, block)) for col, block in changed)
+
+            if company in self.results:
+                stale = self.invalidated_by({col for col, _ in changed})
+            else:
+                stale = set(self._order)
+
+            if stale:
+                self._recompute(company, self._company_data(data, positions), stale)
+                recomputed[company] = stale
+
+            self._fingerprints[company] = fingerprints
+
+        # Companies no longer in the data
+        for company in set(self.results) - set(positions_by_company):
+            del self.results[company]
+            del self._fingerprints[company]
+            self.last_changes.pop(company, None)
+
+        return recomputed
+
+    def _company_data(self, data, positions):
+        if isinstance(data, Ledger):
+            return data.take(positions)
+        return data.iloc[positions].reset_index(drop=True)
+
+    def _recompute(self, company, data, stale):
+        results = self.results.setdefault(company, {})
+        for name in self._order:
+            if name not in stale:
+                continue
+            artifact = self.artifacts[name]
+            upstream = {dep: results[dep] for dep in artifact.depends_on}
+            with stage_timer(f"dependency_graph.{name}"):
+                results[name] = artifact.compute(data, upstream)
+            increment(f"dependency_graph.recompute.{name}")
+
+    def result(self, company, name):
+        return self.results[company][name]
+
+
+# ------------------- Default pipeline graph -------------------
+
+_RISK_COLUMNS = ["Revenue", "Expenses", "Loan EMI", "Inventory", "Payables", "Receivables"]
+_CASH_FLOW_COLUMNS = ["Revenue", "Expenses", "Loan EMI", "Tax Paid"]
+
+
+def _risk(method):
+    return lambda data, upstream: getattr(RiskDetector(data), method)()
+
+
+def build_default_graph(include_report=False, **kwargs):
+    """Artifact graph for the dashboard / report outputs.
+
+    Charts and the PDF report read nearly every column, so they are only
+    added when include_report is True.
+    """
+    graph = ArtifactGraph(**kwargs)
+
+    graph.add("profit", lambda data, up: (data["Revenue"] - data["Expenses"]).to_numpy(),
+              columns=["Revenue", "Expenses"])
+    graph.add("cash_flow", lambda data, up: (
+        data["Revenue"] - (data["Expenses"] + data["Loan EMI"] + data["Tax Paid"])).to_numpy(),
+              columns=_CASH_FLOW_COLUMNS)
+
+    graph.add("rule_based_risk", _risk("rule_based_risk"), columns=_RISK_COLUMNS)
+    graph.add("ml_risk_score", _risk("ml_risk_score"), columns=["Revenue", "Expenses"])
+    graph.add("final_risk_level", lambda data, up: risk_level(up["rule_based_risk"] + up["ml_risk_score"]),
+              depends_on=["rule_based_risk", "ml_risk_score"])
+    graph.add("risk_explanation", _risk("risk_explanation"), columns=_RISK_COLUMNS)
+    graph.add("recommendations", _risk("recommendations"), columns=_RISK_COLUMNS)
+    graph.add("investor_score", _risk("investor_score"), columns=["Revenue", "Expenses"])
+    graph.add("loan_eligibility", _risk("loan_eligibility"), columns=["Revenue", "Expenses", "Loan EMI"])
+    graph.add("bankruptcy_risk", _risk("bankruptcy_risk"), columns=["Revenue", "Expenses", "Loan EMI"])
+    graph.add("fraud_detection", _risk("fraud_detection"), columns=["Revenue", "Expenses", "Tax Paid"])
+
+    graph.add("health_score", lambda data, up: HealthScoreCalculator(data).calculate_score(),
+              columns=["Revenue", "Expenses", "Loan EMI", "Inventory", "Receivables", "Payables"])
+    graph.add("forecast", lambda data, up: ForecastingModel(data).predict_next_month(),
+              columns=["Revenue", "Expenses"])
+    graph.add("working_capital", lambda data, up: working_capital_metrics(data),
+              columns=["Revenue", "Expenses", "Inventory", "Receivables", "Payables"])
+
+    if include_report:
+        from report_generator import render_graphs, build_pdf_report
+        from ledger import with_derived_columns
+
+        graph.add("charts", lambda data, up: render_graphs(with_derived_columns(data)),
+                  columns=["Month"], depends_on=["profit", "cash_flow"])
+        graph.add("report", lambda data, up: build_pdf_report(data, RiskDetector(data)),
+                  columns=["Month"] + _CASH_FLOW_COLUMNS + ["Inventory", "Payables", "Receivables"],
+                  depends_on=["charts"])
+
+    return graph
@@ -1,6 +1,8 @@
 import os
 import google.generativeai as genai
 
+from instrumentation import timed
+
 api_key = os.getenv("GEMINI_API_KEY")
 
 if not api_key:
@@ -16,6 +18,7 @@ class FinalFinancialAdvisor:
     def __init__(self, data):
         self.data = data
 
+    @timed()
     def get_advice(self, user_question):
         try:
             prompt = f"""
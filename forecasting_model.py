@@ -1,11 +1,14 @@
 from sklearn.linear_model import LinearRegression
 import numpy as np
 
+from instrumentation import timed
+
 class ForecastingModel:
 
     def __init__(self, data):
         self.data = data
 
+    @timed()
     def predict_next_month(self):
 
         months = np.arange(len(self.data)).reshape(-1, 1)
@@ -1,7 +1,14 @@
+from instrumentation import timed
+from working_capital import working_capital_summary
+
+
 class HealthScoreCalculator:
-    def __init__(self, data):
+    def __init__(self, data, working_capital=None):
         self.data = data
+        # Optional precomputed working_capital_summary (e.g. RiskDetector.working_capital())
+        self.working_capital = working_capital
 
+    @timed()
     def calculate_score(self):
         revenue_avg = self.data["Revenue"].mean()
         expense_avg = self.data["Expenses"].mean()
@@ -19,4 +26,19 @@ class HealthScoreCalculator:
         if loan_avg > 0.3 * revenue_avg:
             score -= 15
 
+        # Working capital impact (cash conversion cycle in days)
+        working_capital = self.working_capital
+        if working_capital is None:
+            working_capital = working_capital_summary(self.data)
+
+        if working_capital is not None:
+            if working_capital["CCC"] > 90:
+                score -= 10
+            elif working_capital["CCC"] > 60:
+                score -= 5
+
+            # Cycle lengthening by more than two weeks quarter on quarter
+            if working_capital["CCC_trend"] is not None and working_capital["CCC_trend"] > 15:
+                score -= 5
+
         return max(score, 0)
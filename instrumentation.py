@@ -0,0 +1,281 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+
+# Instrumentation is off unless SME_INSTRUMENTATION is set or enable() is called.
+# When off, timed functions pay for two global flag checks per call.
+_enabled = os.getenv("SME_INSTRUMENTATION", "") not in ("", "0")
+
+# Stages whose timed() calls are also run under profile(): a comma-separated
+# list in SME_PROFILE (e.g. "RiskDetector.ml_risk_score"), or "*" for all.
+_profiled = frozenset(s.strip() for s in os.getenv("SME_PROFILE", "").split(",") if s.strip())
+_profiling = threading.local()
+
+
+class Recorder:
+    """Accumulates stage timings, counters and profiles."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.profiles = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [1, seconds, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+                entry[3] = seconds
+
+    def set_profile(self, stage, result):
+        with self._lock:
+            self.profiles[stage] = result
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def drain(self):
+        """Return the raw timings / counters recorded so far and clear them.
+
+        Used to ship measurements from a worker process to the parent, which
+        folds them in with merge().
+        """
+        with self._lock:
+            raw = {"stages": self.stages, "counters": self.counters, "profiles": self.profiles}
+            self.stages, self.counters, self.profiles = {}, {}, {}
+            return raw
+
+    def merge(self, raw):
+        with self._lock:
+            for stage, (count, total, worst, last) in raw["stages"].items():
+                entry = self.stages.get(stage)
+                if entry is None:
+                    self.stages[stage] = [count, total, worst, last]
+                else:
+                    entry[0] += count
+                    entry[1] += total
+                    entry[2] = max(entry[2], worst)
+                    entry[3] = last
+            for name, value in raw["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self.profiles.update(raw.get("profiles", {}))
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.profiles.clear()
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": count,
+                    "total_s": total,
+                    "mean_s": total / count,
+                    "max_s": worst,
+                    "last_s": last,
+                }
+                for stage, (count, total, worst, last) in self.stages.items()
+            }
+            profiles = {stage: dict(result) for stage, result in self.profiles.items()}
+            return {"stages": stages, "counters": dict(self.counters), "profiles": profiles}
+
+
+# Process-wide recorder, plus an optional per-context one (e.g. a dashboard session)
+GLOBAL_RECORDER = Recorder()
+_current = contextvars.ContextVar("sme_recorder", default=None)
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+def profile_stages(*stages):
+    """Profile the given timed() stages ("*" for all), like SME_PROFILE."""
+    global _profiled
+    _profiled = frozenset(stages)
+
+
+def _should_profile(stage):
+    return (stage in _profiled or "*" in _profiled) and not getattr(_profiling, "active", False)
+
+
+def set_recorder(recorder):
+    """Also send measurements from the current context to `recorder`."""
+    _current.set(recorder)
+
+
+def _record(stage, seconds):
+    GLOBAL_RECORDER.record(stage, seconds)
+    local = _current.get()
+    if local is not None and local is not GLOBAL_RECORDER:
+        local.record(stage, seconds)
+
+
+def increment(name, value=1):
+    if not _enabled:
+        return
+    GLOBAL_RECORDER.increment(name, value)
+    local = _current.get()
+    if local is not None and local is not GLOBAL_RECORDER:
+        local.increment(name, value)
+
+
+# ------------------- Timing -------------------
+
+def timed(stage=None):
+    """Decorator recording the wall time of every call under `stage`.
+
+    The stage defaults to the function's qualified name, e.g.
+    "RiskDetector.final_risk_level". Stages selected with SME_PROFILE or
+    profile_stages() are also run under profile().
+    """
+    def decorator(func):
+        name = stage or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiled and _should_profile(name):
+                with profile(name):
+                    return _timed_call(func, name, args, kwargs)
+            if not _enabled:
+                return func(*args, **kwargs)
+            return _timed_call(func, name, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _timed_call(func, name, args, kwargs):
+    if not _enabled:
+        return func(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+class stage_timer:
+    """Context manager form of timed() for blocks of code."""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            _record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+# ------------------- Profiling -------------------
+
+@contextmanager
+def profile(stage, memory=False, sort="cumulative", limit=25):
+    """Capture a cProfile report (and optionally the tracemalloc peak) for a block.
+
+    Runs regardless of enable(); the result is stored under `stage` in the
+    recorder's profiles and also yielded to the caller. Profiles do not
+    nest: timed() stages inside a profiled block are not profiled again.
+    """
+    result = {}
+    profiler = cProfile.Profile()
+    outer = getattr(_profiling, "active", False)
+    _profiling.active = True
+
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if memory:
+        tracemalloc.reset_peak()
+
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        _profiling.active = outer
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        result["profile"] = stream.getvalue()
+
+        if memory:
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+            if started_tracing:
+                tracemalloc.stop()
+
+        GLOBAL_RECORDER.set_profile(stage, result)
+        local = _current.get()
+        if local is not None and local is not GLOBAL_RECORDER:
+            local.set_profile(stage, result)
+
+
+# ------------------- Export -------------------
+
+def export_json(recorder=None):
+    return json.dumps((recorder or GLOBAL_RECORDER).snapshot(), indent=2, sort_keys=True)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def export_prometheus(recorder=None, prefix="sme"):
+    snap = (recorder or GLOBAL_RECORDER).snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Wall time spent per pipeline stage.",
+        f"# TYPE {prefix}_stage_seconds summary",
+    ]
+    for stage, s in sorted(snap["stages"].items()):
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{_label(stage)}"}} {s["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{_label(stage)}"}} {s["total_s"]:.9f}')
+
+    lines.append(f"# HELP {prefix}_stage_seconds_max Slowest observed call per pipeline stage.")
+    lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+    for stage, s in sorted(snap["stages"].items()):
+        lines.append(f'{prefix}_stage_seconds_max{{stage="{_label(stage)}"}} {s["max_s"]:.9f}')
+
+    lines.append(f"# HELP {prefix}_events_total Pipeline event counters.")
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f'{prefix}_events_total{{event="{_label(name)}"}} {value}')
+
+    peaks = {stage: p["peak_mb"] for stage, p in snap["profiles"].items() if "peak_mb" in p}
+    if peaks:
+        lines.append(f"# HELP {prefix}_profile_peak_megabytes Peak traced memory of the last profiled run.")
+        lines.append(f"# TYPE {prefix}_profile_peak_megabytes gauge")
+        for stage, peak in sorted(peaks.items()):
+            lines.append(f'{prefix}_profile_peak_megabytes{{stage="{_label(stage)}"}} {peak:.3f}')
+
+    return "\n".join(lines) + "\n"
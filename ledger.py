@@ -0,0 +1,237 @@
+import numpy as np
+import pandas as pd
+
+
+AMOUNT_COLUMNS = ["Revenue", "Expenses", "Inventory", "Receivables", "Payables", "Loan EMI", "Tax Paid"]
+
+def _wide(values):
+    # int64 / float64 before combining columns, so int32 storage cannot overflow
+    return values.astype(np.int64 if values.dtype.kind in "iub" else np.float64)
+
+
+# Derived columns as functions of a column getter, so the same definitions
+# serve Ledger arrays and DataFrame Series
+DERIVED_COLUMNS = {
+    "Profit": lambda get: _wide(get("Revenue")) - _wide(get("Expenses")),
+    "Cash Flow": lambda get: _wide(get("Revenue")) - (
+        _wide(get("Expenses")) + _wide(get("Loan EMI")) + _wide(get("Tax Paid"))),
+}
+
+_DERIVED_INPUTS = ["Revenue", "Expenses", "Loan EMI", "Tax Paid"]
+
+# int32 columns stay within a quarter of the int32 range, so sums and
+# differences of up to four amount columns (as in RiskDetector) cannot wrap
+_INT32_SAFE = np.iinfo(np.int32).max // 4
+
+
+def _compact(values):
+    """Smallest lossless-enough numeric array for a column, or None if not numeric."""
+    values = np.asarray(values)
+
+    if values.dtype.kind == "b":
+        return values
+
+    if values.dtype.kind in "iu":
+        if values.size == 0 or (values.min() >= -_INT32_SAFE and values.max() <= _INT32_SAFE):
+            return values.astype(np.int32)
+        return values.astype(np.int64)
+
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values).all()
+        if finite and values.size and (values.min() >= -_INT32_SAFE and values.max() <= _INT32_SAFE) \
+                and np.array_equal(values, np.round(values)):
+            return values.astype(np.int32)
+        # float32 only when every value survives the round trip, so amounts
+        # like 123456789.37 are never silently rounded
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+            return narrow
+        return values.astype(np.float64)
+
+    return None
+
+
+class Ledger:
+    """Compact, array-backed financial ledger.
+
+    Amount columns are int32 (float32 when they hold fractions float32
+    represents exactly; int64 / float64 when values are too large for sums of
+    them to stay in int32 or would lose precision), bool columns stay bool, text
+    columns such as Month and Company are categoricals, and Profit /
+    Cash Flow are computed lazily. Column access returns pandas Series
+    that wrap the underlying arrays without copying, so RiskDetector,
+    HealthScoreCalculator, ForecastingModel and the report generator
+    accept a Ledger anywhere they accept a DataFrame.
+    """
+
+    def __init__(self, arrays, labels=None, order=None):
+        self._arrays = arrays
+        self._labels = labels or {}
+        self._order = order or list(self._labels) + list(self._arrays)
+        self._derived = {}
+
+        lengths = {len(a) for a in self._arrays.values()} | {len(c) for c in self._labels.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Ledger columns have different lengths: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else 0
+
+    # ------------------- Construction -------------------
+
+    @classmethod
+    def from_frame(cls, df):
+        arrays, labels = {}, {}
+        for col in df.columns:
+            compact = _compact(df[col].to_numpy())
+            if compact is None:
+                labels[col] = pd.Categorical(df[col])
+            else:
+                arrays[col] = compact
+        return cls(arrays, labels, list(df.columns))
+
+    @classmethod
+    def from_csv(cls, file_path, **read_csv_kwargs):
+        dtype = {"Month": "category", "Company": "category"}
+        dtype.update(read_csv_kwargs.pop("dtype", {}))
+        return cls.from_frame(pd.read_csv(file_path, dtype=dtype, **read_csv_kwargs))
+
+    def to_frame(self, derived=True):
+        frame = pd.DataFrame({col: self[col] for col in self._order})
+        if derived:
+            for col in DERIVED_COLUMNS:
+                if col in self and col not in frame.columns:
+                    frame[col] = self[col]
+        return frame
+
+    # ------------------- DataFrame-like access -------------------
+
+    def array(self, col):
+        """Raw NumPy array (or Categorical) behind a column."""
+        if col in self._arrays:
+            return self._arrays[col]
+        if col in self._labels:
+            return self._labels[col]
+        if col in DERIVED_COLUMNS:
+            if col not in self._derived:
+                self._derived[col] = DERIVED_COLUMNS[col](self.array)
+            return self._derived[col]
+        raise KeyError(col)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return pd.Series(self.array(key), name=key, copy=False)
+
+        if isinstance(key, list):
+            arrays = {c: self._arrays[c] for c in key if c in self._arrays}
+            labels = {c: self._labels[c] for c in key if c in self._labels}
+            return Ledger(arrays, labels, [c for c in key if c in arrays or c in labels])
+
+        # Boolean mask, e.g. ledger[ledger["Month"] == "2024-01"]
+        return self.take(np.flatnonzero(np.asarray(key)))
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, col):
+        return col in self._arrays or col in self._labels or (
+            col in DERIVED_COLUMNS and all(c in self._arrays for c in _DERIVED_INPUTS))
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    @property
+    def columns(self):
+        derived = [c for c in DERIVED_COLUMNS if c in self and c not in self._order]
+        return pd.Index(self._order + derived)
+
+    @property
+    def shape(self):
+        return (self._length, len(self.columns))
+
+    def _select(self, index):
+        ledger = Ledger(
+            {c: a[index] for c, a in self._arrays.items()},
+            {c: cat[index] for c, cat in self._labels.items()},
+            self._order,
+        )
+        ledger._derived = {c: a[index] for c, a in self._derived.items()}
+        return ledger
+
+    def take(self, indices):
+        return self._select(np.asarray(indices))
+
+    def slice(self, start=None, stop=None):
+        # Basic slices are views of the underlying arrays
+        return self._select(slice(start, stop))
+
+    def head(self, n=5):
+        return self.slice(0, n)
+
+    def tail(self, n=5):
+        return self.slice(max(self._length - n, 0), None)
+
+    def iterrows(self):
+        return self.to_frame().iterrows()
+
+    def split(self, column="Company"):
+        """Yield (label, Ledger) per value of a categorical column."""
+        codes = self._labels[column].codes
+        categories = self._labels[column].categories
+
+        if _is_grouped(codes):
+            # Rows of each group are contiguous: hand out views
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            starts = np.concatenate(([0], bounds))
+            stops = np.concatenate((bounds, [len(codes)]))
+            for start, stop in zip(starts, stops):
+                yield categories[codes[start]], self.slice(start, stop)
+        else:
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+            for group in np.split(order, bounds):
+                if len(group):
+                    yield categories[codes[group[0]]], self.take(group)
+
+    # ------------------- Introspection -------------------
+
+    def memory_usage(self):
+        total = sum(a.nbytes for a in self._arrays.values())
+        total += sum(a.nbytes for a in self._derived.values())
+        for cat in self._labels.values():
+            total += cat.codes.nbytes + cat.categories.memory_usage(deep=True)
+        return total
+
+    def __repr__(self):
+        return repr(self.to_frame())
+
+
+def _is_grouped(codes):
+    # True when every code value occupies a single contiguous run
+    if len(codes) == 0:
+        return True
+    run_starts = np.concatenate(([True], codes[1:] != codes[:-1]))
+    return np.unique(codes[run_starts]).size == run_starts.sum()
+
+
+def with_derived_columns(data):
+    """Return `data` with Profit and Cash Flow available.
+
+    A Ledger computes them lazily, so it is returned as is. A DataFrame that
+    already has both columns is returned unchanged; otherwise the missing
+    columns are added to a shallow copy so the caller's frame is untouched.
+    """
+    if isinstance(data, Ledger):
+        return data
+
+    missing = {col: fn for col, fn in DERIVED_COLUMNS.items() if col not in data.columns}
+    if not missing:
+        return data
+
+    return data.assign(**{col: (lambda d, fn=fn: fn(d.__getitem__)) for col, fn in missing.items()})
+
+
+def as_frame(data):
+    """DataFrame view for display code (st.dataframe, .iloc); copies a Ledger."""
+    if isinstance(data, Ledger):
+        return data.to_frame()
+    return data
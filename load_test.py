@@ -0,0 +1,74 @@
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def send_request(url, payload=None):
+    data = None
+    headers = {}
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+
+    request = urllib.request.Request(url, data=data, headers=headers)
+
+    # Non-2xx responses and connection failures are counted as errors, not raised
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except urllib.error.URLError:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def run_load_test(url, requests, concurrency, payload=None):
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: send_request(url, payload), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(1 for _, status in results if status != 200)
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+        "requests_per_sec": round(requests / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for scoring_service.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoints", nargs="+", default=["/score", "/forecast"])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--question", default="How can I improve profit?")
+    args = parser.parse_args()
+
+    for endpoint in args.endpoints:
+        payload = {"question": args.question} if endpoint == "/advice" else None
+        stats = run_load_test(args.url + endpoint, args.requests, args.concurrency, payload)
+
+        print(f"{endpoint:<10} p50={stats['p50_ms']}ms  p99={stats['p99_ms']}ms  "
+              f"max={stats['max_ms']}ms  {stats['requests_per_sec']} req/s  "
+              f"errors={stats['errors']}/{stats['requests']}")
+
+
+if __name__ == "__main__":
+    main()
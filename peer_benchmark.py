@@ -0,0 +1,251 @@
+import bisect
+import math
+
+import numpy as np
+
+
+# Metric -> True when a higher value is better for the company
+PEER_METRICS = {
+    "expense_ratio": False,
+    "emi_ratio": False,
+    "margin": True,
+    "cash_flow_volatility": False,
+}
+
+# MSME size bands by annual turnover (INR)
+SIZE_BANDS = [
+    (5_00_00_000, "MICRO"),
+    (50_00_00_000, "SMALL"),
+    (250_00_00_000, "MEDIUM"),
+]
+
+# Above this many changes per cohort list, re-sort instead of bisect-updating
+_REBUILD_THRESHOLD = 32
+
+
+def size_band(annual_turnover):
+    for limit, band in SIZE_BANDS:
+        if annual_turnover <= limit:
+            return band
+    return "LARGE"
+
+
+class _CompanyLedger:
+    """Per-company monthly figures and the running sums the metrics need."""
+
+    __slots__ = ("sector", "months", "revenue", "expenses", "emi", "cf_sum", "cf_sumsq")
+
+    def __init__(self, sector):
+        self.sector = sector
+        self.months = {}
+        self.revenue = 0.0
+        self.expenses = 0.0
+        self.emi = 0.0
+        self.cf_sum = 0.0
+        self.cf_sumsq = 0.0
+
+    def _apply(self, revenue, expenses, emi, sign):
+        # Cash flow volatility uses Revenue - Expenses, as in RiskDetector.ml_risk_score
+        cash_flow = revenue - expenses
+        self.revenue += sign * revenue
+        self.expenses += sign * expenses
+        self.emi += sign * emi
+        self.cf_sum += sign * cash_flow
+        self.cf_sumsq += sign * cash_flow * cash_flow
+
+    def upsert(self, month, revenue, expenses, emi):
+        # A month seen before is a correction: replace its old figures
+        old = self.months.get(month)
+        if old is not None:
+            self._apply(*old, -1)
+        self.months[month] = (revenue, expenses, emi)
+        self._apply(revenue, expenses, emi, 1)
+
+    def metrics(self):
+        n = len(self.months)
+        if n == 0 or not math.isfinite(self.revenue) or self.revenue <= 0:
+            return None
+        if not all(map(math.isfinite, (self.expenses, self.emi, self.cf_sum, self.cf_sumsq))):
+            return None
+
+        mean_cf = self.cf_sum / n
+        variance = max(self.cf_sumsq / n - mean_cf * mean_cf, 0.0)
+
+        return {
+            "expense_ratio": self.expenses / self.revenue,
+            "emi_ratio": self.emi / self.revenue,
+            "margin": (self.revenue - self.expenses) / self.revenue,
+            "cash_flow_volatility": math.sqrt(variance),
+        }
+
+    def cohort(self):
+        annual_turnover = self.revenue / len(self.months) * 12
+        return (self.sector, size_band(annual_turnover))
+
+
+class PeerBenchmarkIndex:
+    """Sorted per-cohort, per-metric index for peer percentile ranks.
+
+    Companies are grouped into cohorts of (sector, size band). For every cohort
+    and metric the index keeps a sorted list of company values, so a
+    percentile rank is two binary searches. Ingesting new (or corrected)
+    company-months only re-positions the companies they touch.
+    """
+
+    def __init__(self, company_column="Company", sector_column="Sector"):
+        self.company_column = company_column
+        self.sector_column = sector_column
+
+        self._companies = {}
+        self._current = {}
+        self._members = {}
+        self._values = {}
+
+    @classmethod
+    def build(cls, data, **kwargs):
+        index = cls(**kwargs)
+        index.ingest(data)
+        return index
+
+    # ------------------- Ingestion -------------------
+
+    def ingest(self, data):
+        """Add or correct company-months from a DataFrame or Ledger.
+
+        Needs Company, Month, Revenue, Expenses and Loan EMI columns; Sector
+        is optional (companies without one share the "ALL" sector).
+
+        Rows with a missing or non-finite Revenue, Expenses or Loan EMI are
+        skipped, so they cannot poison a company's running sums; a month
+        skipped this way keeps its previous figures, if any.
+        """
+        companies = np.asarray(data[self.company_column], dtype=object)
+        months = np.asarray(data["Month"], dtype=object)
+        revenue = np.asarray(data["Revenue"], dtype=np.float64)
+        expenses = np.asarray(data["Expenses"], dtype=np.float64)
+        emi = np.asarray(data["Loan EMI"], dtype=np.float64)
+
+        if self.sector_column in data.columns:
+            sectors = np.asarray(data[self.sector_column], dtype=object)
+        else:
+            sectors = np.full(len(companies), "ALL", dtype=object)
+
+        finite = np.isfinite(revenue) & np.isfinite(expenses) & np.isfinite(emi)
+        if not finite.all():
+            print(f"Peer index: skipped {int((~finite).sum())} rows with missing figures.")
+            companies, sectors, months = companies[finite], sectors[finite], months[finite]
+            revenue, expenses, emi = revenue[finite], expenses[finite], emi[finite]
+
+        touched = set()
+        for company, sector, month, r, e, l in zip(
+                companies.tolist(), sectors.tolist(), months.tolist(),
+                revenue.tolist(), expenses.tolist(), emi.tolist()):
+            ledger = self._companies.get(company)
+            if ledger is None:
+                ledger = self._companies[company] = _CompanyLedger(sector)
+            ledger.sector = sector
+            ledger.upsert(month, r, e, l)
+            touched.add(company)
+
+        self._reindex(touched)
+        return len(touched)
+
+    def _reindex(self, touched):
+        # (cohort, metric) -> values leaving / entering that sorted list
+        removals, additions = {}, {}
+
+        for company in touched:
+            old = self._current.pop(company, None)
+            if old is not None:
+                cohort, metrics = old
+                self._members[cohort].discard(company)
+                for metric, value in metrics.items():
+                    removals.setdefault((cohort, metric), []).append(value)
+
+            ledger = self._companies[company]
+            metrics = ledger.metrics()
+            if metrics is None:
+                continue
+
+            cohort = ledger.cohort()
+            self._current[company] = (cohort, metrics)
+            self._members.setdefault(cohort, set()).add(company)
+            for metric, value in metrics.items():
+                additions.setdefault((cohort, metric), []).append(value)
+
+        for key in set(removals) | set(additions):
+            cohort, metric = key
+            values = self._values.setdefault(key, [])
+            removed = removals.get(key, [])
+            added = additions.get(key, [])
+
+            if len(removed) + len(added) > _REBUILD_THRESHOLD:
+                values[:] = sorted(self._current[c][1][metric] for c in self._members.get(cohort, ()))
+            else:
+                for value in removed:
+                    del values[bisect.bisect_left(values, value)]
+                for value in added:
+                    bisect.insort(values, value)
+
+            if not values:
+                del self._values[key]
+
+    # ------------------- Queries -------------------
+
+    def __len__(self):
+        return len(self._current)
+
+    def __contains__(self, company):
+        return company in self._current
+
+    def cohort(self, company):
+        return self._current[company][0]
+
+    def cohort_size(self, cohort):
+        return len(self._members.get(cohort, ()))
+
+    def metrics(self, company):
+        return dict(self._current[company][1])
+
+    def percentile_of(self, value, metric, cohort):
+        """Percentile rank (0-100) of `value` among the cohort's values."""
+        values = self._values.get((cohort, metric))
+        if not values:
+            return None
+
+        below = bisect.bisect_left(values, value)
+        equal = bisect.bisect_right(values, value) - below
+        return 100.0 * (below + 0.5 * equal) / len(values)
+
+    def percentile(self, company, metric):
+        cohort, metrics = self._current[company]
+        return self.percentile_of(metrics[metric], metric, cohort)
+
+    def percentiles(self, company):
+        return {metric: self.percentile(company, metric) for metric in PEER_METRICS}
+
+    # 📊 Peer comparison in the same register as RiskDetector explanations
+    def peer_explanation(self, company, threshold=75.0):
+
+        cohort = self.cohort(company)
+        ranks = self.percentiles(company)
+        names = {
+            "expense_ratio": "Expense ratio",
+            "emi_ratio": "Loan EMI burden",
+            "margin": "Profit margin",
+            "cash_flow_volatility": "Cash flow volatility",
+        }
+
+        reasons = []
+        for metric, rank in ranks.items():
+            # Standing = share of peers this company does better than
+            standing = rank if PEER_METRICS[metric] else 100.0 - rank
+            if standing >= threshold:
+                reasons.append(f"{names[metric]} better than {standing:.0f}% of {cohort[1].lower()} {cohort[0]} peers")
+            elif standing <= 100.0 - threshold:
+                reasons.append(f"{names[metric]} worse than {100.0 - standing:.0f}% of {cohort[1].lower()} {cohort[0]} peers")
+
+        if not reasons:
+            reasons.append("In line with sector and size peers")
+
+        return reasons
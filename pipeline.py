@@ -0,0 +1,40 @@
+from risk_detection import RiskDetector
+from health_score import HealthScoreCalculator
+from forecasting_model import ForecastingModel
+from report_generator import generate_pdf_report, build_pdf_report
+
+
+# Shared scoring / forecasting / report steps used by the non-UI entry points
+# (scoring_service.py and batch_runner.py).
+
+def score_company(data):
+    risk = RiskDetector(data)
+    return {
+        "risk_level": risk.final_risk_level(),
+        "risk_score": risk.rule_based_risk() + risk.ml_risk_score(),
+        "health_score": HealthScoreCalculator(data, risk.working_capital()).calculate_score(),
+        "cash_conversion_cycle": risk.cash_conversion_cycle(),
+        "risk_explanation": risk.risk_explanation(),
+        "recommendations": risk.recommendations(),
+        "investor_decision": risk.investor_score(),
+        "loan_eligibility": risk.loan_eligibility(),
+        "bankruptcy_prediction": risk.bankruptcy_risk(),
+        "fraud_detection": risk.fraud_detection(),
+    }
+
+
+def forecast_company(data):
+    revenue, expenses = ForecastingModel(data).predict_next_month()
+    return {
+        "predicted_revenue": float(revenue),
+        "predicted_expenses": float(expenses),
+        "predicted_profit": float(round(revenue - expenses, 2)),
+    }
+
+
+def build_report(data, filename):
+    return generate_pdf_report(data, RiskDetector(data), filename)
+
+
+def report_bytes(data):
+    return build_pdf_report(data, RiskDetector(data))
@@ -1,11 +1,101 @@
 from fpdf import FPDF
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+import hashlib
+import io
 import os
+import tempfile
+import threading
+from collections import OrderedDict
 
+from instrumentation import timed, increment
+from ledger import with_derived_columns
 
-def generate_graphs(data):
-    """Generate graphs and save as images"""
+
+# ---------------- Section cache ----------------
+# Every report section is built from a small set of columns. Its content is
+# cached under a fingerprint of exactly those columns, so regenerating a report
+# only rebuilds the sections whose inputs changed, and an unchanged report is
+# returned straight from the document cache.
+
+class _LRUCache:
+    """Shared by every dashboard session thread, so all access is locked."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+_section_cache = _LRUCache(512)
+_document_cache = _LRUCache(32)
+
+
+def clear_report_cache():
+    _section_cache.clear()
+    _document_cache.clear()
+
+
+def _hashable(values):
+    # Integers (and whole-number floats, which a Ledger stores as int32) are
+    # hashed as int64 and other floats as float64, so the storage dtype does
+    # not change the hash
+    series = pd.Series(values)
+    kind = series.dtype.kind
+    if kind in "iub":
+        return series.astype(np.int64)
+    if kind == "f":
+        array = series.to_numpy(dtype=np.float64)
+        if np.isfinite(array).all() and np.array_equal(array, np.round(array)):
+            return series.astype(np.int64)
+        return series.astype(np.float64)
+    return series
+
+
+def fingerprint(data, columns):
+    """Content hash of the given columns. Values are normalised before hashing
+    (see _hashable), so a Ledger and a DataFrame holding the same values share
+    a fingerprint."""
+    digest = hashlib.sha1()
+    digest.update(str(len(data)).encode())
+    for col in columns:
+        digest.update(col.encode())
+        values = pd.util.hash_pandas_object(_hashable(data[col]), index=False)
+        digest.update(values.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _pdf_text(text):
+    # Core PDF fonts are latin-1 only
+    return str(text).replace("—", "-").replace("–", "-") \
+        .encode("latin-1", "replace").decode("latin-1")
+
+
+# ---------------- Graphs ----------------
+
+def render_graphs(data):
+    """Render both report graphs and return them as PNG bytes"""
+
+    graphs = {}
 
     # Revenue vs Expense vs Profit
     plt.figure()
@@ -17,8 +107,10 @@ def generate_graphs(data):
     plt.ylabel("Amount (INR)")
     plt.legend()
     plt.tight_layout()
-    plt.savefig("revenue_expense_profit.png")
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png")
     plt.close()
+    graphs["revenue_expense_profit.png"] = buffer.getvalue()
 
     # Cash Flow Bar Graph
     plt.figure()
@@ -27,32 +119,289 @@ def generate_graphs(data):
     plt.xlabel("Month")
     plt.ylabel("Cash Flow (INR)")
     plt.tight_layout()
-    plt.savefig("cashflow.png")
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png")
     plt.close()
+    graphs["cashflow.png"] = buffer.getvalue()
 
+    return graphs
 
-def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
 
-    data = data.copy()
-    data["Profit"] = data["Revenue"] - data["Expenses"]
-    data["Cash Flow"] = data["Revenue"] - (data["Expenses"] + data["Loan EMI"] + data["Tax Paid"])
+@timed()
+def generate_graphs(data):
+    """Generate graphs and save as images"""
 
-    # Generate graphs
-    generate_graphs(data)
+    for name, png in render_graphs(with_derived_columns(data)).items():
+        with open(name, "wb") as f:
+            f.write(png)
 
+
+# ---------------- Section content ----------------
+
+def _summary_content(data, risk_obj):
     total_revenue = data["Revenue"].sum()
     total_expense = data["Expenses"].sum()
     total_profit = data["Profit"].sum()
-    avg_profit_margin = (total_profit / total_revenue) * 100
 
+    return {
+        "total_revenue": total_revenue,
+        "total_expense": total_expense,
+        "total_profit": total_profit,
+        "avg_profit_margin": (total_profit / total_revenue) * 100,
+    }
+
+
+def _risk_content(data, risk_obj):
+    return {
+        "risk_level": risk_obj.final_risk_level(),
+        "reasons": risk_obj.risk_explanation(),
+        "recommendations": risk_obj.recommendations(),
+    }
+
+
+def _bi_content(data, risk_obj):
+    return {
+        "investor_result": risk_obj.investor_score(),
+        "loan_result": risk_obj.loan_eligibility(),
+        "bankruptcy_result": risk_obj.bankruptcy_risk(),
+        "fraud_result": risk_obj.fraud_detection(),
+    }
+
+
+@timed("generate_graphs")
+def _charts_content(data, risk_obj):
+    return render_graphs(data)
+
+
+# ---------------- Table formatting ----------------
+
+RECENT_COLUMNS = ["Month", "Revenue", "Expenses", "Profit", "Cash Flow"]
+HISTORY_COLUMNS = ["Month", "Revenue", "Expenses", "Loan EMI", "Tax Paid", "Profit", "Cash Flow"]
+
+
+_DIGIT_POWERS = np.uint64(10) ** np.arange(20, dtype=np.uint64)
+
+
+def _amount_matrix(values):
+    """Right-aligned '{:,}' text of an amount column as a (rows, width) byte
+    matrix, space padded, blank for missing values.
+
+    Built one digit position at a time across the whole column: digit j
+    (from the right) lands in column width - 1 - (j + j // 3), with a
+    separator before every third digit.
+    """
+    values = pd.Series(values)
+    missing = values.isna().to_numpy()
+    amounts = values.fillna(0).round().to_numpy(dtype=np.int64)
+
+    negative = amounts < 0
+    magnitude = np.abs(amounts).astype(np.uint64)
+    n_digits = np.maximum(np.searchsorted(_DIGIT_POWERS, magnitude, side="right"), 1)
+    length = n_digits + (n_digits - 1) // 3 + negative
+    length[missing] = 0
+
+    width = int(length.max()) if len(amounts) else 0
+    chars = np.full((len(amounts), width), ord(" "), dtype=np.uint8)
+    if width == 0:
+        return chars
+
+    # uint32 division is much cheaper when the column allows it
+    remaining = magnitude.astype(np.uint32) if magnitude.max() <= np.iinfo(np.uint32).max else magnitude
+    present = ~missing
+    for j in range(int(n_digits.max())):
+        position = width - 1 - (j + j // 3)
+        shown = present & (n_digits > j)
+        if j and j % 3 == 0:
+            chars[shown, position + 1] = ord(",")
+        chars[shown, position] = (remaining[shown] % 10).astype(np.uint8) + ord("0")
+        remaining = remaining // 10
+
+    signed = np.flatnonzero(negative & present)
+    chars[signed, width - length[signed]] = ord("-")
+    return chars
+
+
+def _matrix_text(chars):
+    # (rows, width) byte matrix -> array of str, one per row
+    if chars.shape[1] == 0:
+        return np.full(chars.shape[0], "", dtype=str)
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(str)
+
+
+def format_columns(data, columns):
+    """Format whole columns as display strings, one vectorized pass per column.
+
+    Amounts get thousands separators; missing values become empty strings.
+    Returns {column: numpy array of str}.
+    """
+    formatted = {}
+    for col in columns:
+        values = pd.Series(data[col])
+        if pd.api.types.is_numeric_dtype(values):
+            text = np.char.lstrip(_matrix_text(_amount_matrix(values)))
+        else:
+            text = values.astype(str).to_numpy(dtype=str)
+        formatted[col] = text.astype(object)
+    return formatted
+
+
+def _table_lines(data, columns, gap="  "):
+    # Fixed-width text lines (header first) for the monospace bulk table.
+    # Amounts stay right-aligned byte matrices; each line is assembled with
+    # NumPy string ufuncs, so no per-cell Python formatting or padding.
+    header, lines = [], None
+    for i, col in enumerate(columns):
+        values = pd.Series(data[col])
+
+        # Labels are left-aligned, amounts right-aligned
+        if i == 0 or col == "Company" or not pd.api.types.is_numeric_dtype(values):
+            text = values.astype(str).to_numpy(dtype=str)
+            width = max(len(col), int(np.char.str_len(text).max()) if len(text) else 0)
+            header.append(col.ljust(width))
+            text = np.char.ljust(text, width)
+        else:
+            text = _matrix_text(_amount_matrix(values))
+            width = max(len(col), text.dtype.itemsize // 4)
+            header.append(col.rjust(width))
+            text = np.char.rjust(text, width)
+
+        lines = text if lines is None else np.char.add(np.char.add(lines, gap), text)
+
+    if lines is None:
+        return gap.join(header), []
+    return gap.join(header), lines.tolist()
+
+
+def _recent_content(data, risk_obj):
+    formatted = format_columns(data.tail(5), RECENT_COLUMNS)
+    return [list(row) for row in zip(*(formatted[col] for col in RECENT_COLUMNS))]
+
+
+@timed("report.history_table")
+def _history_content(data, risk_obj):
+    columns = (["Company"] if "Company" in data.columns else []) + HISTORY_COLUMNS
+    header, lines = _table_lines(data, columns)
+
+    if not all(line.isascii() for line in lines):
+        lines = [_pdf_text(line) for line in lines]
+    return _pdf_text(header), lines
+
+
+def _conclusion_content(data, risk_obj):
     risk_level = risk_obj.final_risk_level()
-    reasons = risk_obj.risk_explanation()
-    recommendations = risk_obj.recommendations()
 
-    investor_result = risk_obj.investor_score()
-    loan_result = risk_obj.loan_eligibility()
-    bankruptcy_result = risk_obj.bankruptcy_risk()
-    fraud_result = risk_obj.fraud_detection()
+    if risk_level == "LOW RISK":
+        return "Business is financially stable. Focus on scaling, maintaining profit margin, and improving cash flow planning."
+    elif risk_level == "MEDIUM RISK":
+        return "Business is moderately stable. Expense control and receivable management are required for better stability."
+    else:
+        return "Business is under high risk. Immediate restructuring, cost optimization, and loan management is recommended."
+
+
+_CASH_FLOW_INPUTS = ["Revenue", "Expenses", "Loan EMI", "Tax Paid"]
+_RISK_INPUTS = ["Revenue", "Expenses", "Loan EMI", "Inventory", "Payables", "Receivables"]
+
+# name -> (content builder, columns of the report data, columns of risk_obj.data)
+REPORT_SECTIONS = OrderedDict([
+    ("summary", (_summary_content, ["Revenue", "Expenses"], [])),
+    ("risk", (_risk_content, [], _RISK_INPUTS)),
+    ("bi", (_bi_content, [], _CASH_FLOW_INPUTS)),
+    ("charts", (_charts_content, ["Month"] + _CASH_FLOW_INPUTS, [])),
+    ("recent", (_recent_content, ["Month"] + _CASH_FLOW_INPUTS, [])),
+    ("conclusion", (_conclusion_content, [], _RISK_INPUTS)),
+    ("history", (_history_content, ["Month"] + _CASH_FLOW_INPUTS, [])),
+])
+
+# Sections that are only built when asked for
+OPTIONAL_SECTIONS = {"history"}
+
+
+def _section_key(name, data, risk_obj):
+    _, data_columns, risk_columns = REPORT_SECTIONS[name]
+
+    if name == "history" and "Company" in data.columns:
+        data_columns = ["Company"] + data_columns
+
+    # The recent-data table only depends on the last rows
+    source = data.tail(5) if name == "recent" else data
+
+    return (
+        name,
+        fingerprint(source, data_columns),
+        type(risk_obj).__name__,
+        fingerprint(risk_obj.data, risk_columns) if risk_columns else None,
+    )
+
+
+def _section(name, key, data, risk_obj):
+    content = _section_cache.get(key)
+    if content is None:
+        increment("report.section_miss")
+        content = REPORT_SECTIONS[name][0](data, risk_obj)
+        _section_cache.put(key, content)
+    else:
+        increment("report.section_hit")
+    return content
+
+
+# ---------------- PDF assembly ----------------
+
+def _write_bulk_table(pdf, header, lines, font_size=7.0, min_font_size=4.0):
+    """Write a pre-formatted monospace table, one text op per row.
+
+    Rows are split into pages up front and the header is repeated on each
+    page, so no per-cell layout or automatic page-break checks are needed.
+    """
+    usable_width = pdf.w - pdf.l_margin - pdf.r_margin
+
+    # Shrink the font until the widest line fits the page
+    pdf.set_font("Courier", "", font_size)
+    while pdf.get_string_width(header) > usable_width and font_size > min_font_size:
+        font_size -= 0.5
+        pdf.set_font("Courier", "", font_size)
+
+    line_h = font_size * 0.5
+    bottom = pdf.h - pdf.b_margin
+    x = pdf.l_margin
+
+    pdf.set_auto_page_break(False)
+
+    start = 0
+    while start < len(lines):
+        y = pdf.get_y()
+        rows = int((bottom - y) // line_h) - 2
+        if rows < 1:
+            pdf.add_page()
+            continue
+
+        pdf.set_font("Courier", "B", font_size)
+        y += line_h
+        pdf.text(x, y, header)
+        pdf.line(x, y + 1, x + usable_width, y + 1)
+
+        pdf.set_font("Courier", "", font_size)
+        y += 1
+        for line in lines[start:start + rows]:
+            y += line_h
+            pdf.text(x, y, line)
+
+        start += rows
+        if start < len(lines):
+            pdf.add_page()
+        else:
+            pdf.set_y(y + line_h)
+
+    pdf.set_auto_page_break(True, margin=15)
+
+
+def _pdf_bytes(pdf):
+    out = pdf.output(dest="S")
+    if isinstance(out, str):
+        return out.encode("latin-1")
+    return bytes(out)
+
+
+def _render_pdf(s, scratch):
 
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -72,32 +421,36 @@ def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
     pdf.ln(5)
 
     # ---------------- Financial Summary ----------------
+    summary = s["summary"]
+
     pdf.set_font("Arial", "B", 14)
     pdf.cell(0, 10, "1) Financial Summary", ln=True)
 
     pdf.set_font("Arial", "", 12)
-    pdf.cell(0, 8, f"Total Revenue: INR {total_revenue:,.0f}", ln=True)
-    pdf.cell(0, 8, f"Total Expenses: INR {total_expense:,.0f}", ln=True)
-    pdf.cell(0, 8, f"Total Profit: INR {total_profit:,.0f}", ln=True)
-    pdf.cell(0, 8, f"Average Profit Margin: {avg_profit_margin:.2f}%", ln=True)
+    pdf.cell(0, 8, f"Total Revenue: INR {summary['total_revenue']:,.0f}", ln=True)
+    pdf.cell(0, 8, f"Total Expenses: INR {summary['total_expense']:,.0f}", ln=True)
+    pdf.cell(0, 8, f"Total Profit: INR {summary['total_profit']:,.0f}", ln=True)
+    pdf.cell(0, 8, f"Average Profit Margin: {summary['avg_profit_margin']:.2f}%", ln=True)
 
     pdf.ln(6)
 
     # ---------------- Risk Section ----------------
+    risk = s["risk"]
+
     pdf.set_font("Arial", "B", 14)
     pdf.cell(0, 10, "2) Risk Assessment", ln=True)
 
     pdf.set_font("Arial", "", 12)
-    pdf.cell(0, 8, f"Overall Risk Level: {risk_level}", ln=True)
+    pdf.cell(0, 8, f"Overall Risk Level: {risk['risk_level']}", ln=True)
     pdf.ln(3)
 
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 8, "Risk Explanation:", ln=True)
 
     pdf.set_font("Arial", "", 12)
-    for r in reasons:
+    for r in risk["reasons"]:
         pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 7, f"- {r}")
+        pdf.multi_cell(0, 7, _pdf_text(f"- {r}"))
 
     pdf.ln(5)
 
@@ -106,29 +459,31 @@ def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
     pdf.cell(0, 10, "3) AI Recommendations", ln=True)
 
     pdf.set_font("Arial", "", 12)
-    for rec in recommendations:
+    for rec in risk["recommendations"]:
         pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 7, f"- {rec}")
+        pdf.multi_cell(0, 7, _pdf_text(f"- {rec}"))
 
     pdf.ln(5)
 
     # ---------------- Business Intelligence ----------------
+    bi = s["bi"]
+
     pdf.set_font("Arial", "B", 14)
     pdf.cell(0, 10, "4) Business Intelligence Results", ln=True)
 
     pdf.set_font("Arial", "", 12)
 
     pdf.set_x(pdf.l_margin)
-    pdf.multi_cell(0, 8, f"Investor Decision: {investor_result}")
+    pdf.multi_cell(0, 8, f"Investor Decision: {bi['investor_result']}")
 
     pdf.set_x(pdf.l_margin)
-    pdf.multi_cell(0, 8, f"Loan Eligibility: {loan_result}")
+    pdf.multi_cell(0, 8, f"Loan Eligibility: {bi['loan_result']}")
 
     pdf.set_x(pdf.l_margin)
-    pdf.multi_cell(0, 8, f"Bankruptcy Prediction: {bankruptcy_result}")
+    pdf.multi_cell(0, 8, f"Bankruptcy Prediction: {bi['bankruptcy_result']}")
 
     pdf.set_x(pdf.l_margin)
-    pdf.multi_cell(0, 8, f"Fraud Detection: {fraud_result}")
+    pdf.multi_cell(0, 8, f"Fraud Detection: {bi['fraud_result']}")
 
     pdf.ln(6)
 
@@ -137,12 +492,13 @@ def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
     pdf.cell(0, 10, "5) Financial Graph Analysis", ln=True)
     pdf.ln(5)
 
-    if os.path.exists("revenue_expense_profit.png"):
-        pdf.image("revenue_expense_profit.png", x=15, w=180)
-        pdf.ln(8)
-
-    if os.path.exists("cashflow.png"):
-        pdf.image("cashflow.png", x=15, w=180)
+    # Chart PNGs come from the cache; FPDF reads images from disk, so they
+    # are written to this report's private scratch directory
+    for name, png in s["charts"].items():
+        path = os.path.join(scratch, name)
+        with open(path, "wb") as f:
+            f.write(png)
+        pdf.image(path, x=15, w=180)
         pdf.ln(8)
 
     # ---------------- Table Section (NEW PAGE) ----------------
@@ -152,8 +508,6 @@ def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
     pdf.cell(0, 10, "6) Recent Financial Data (Last 5 Months)", ln=True)
     pdf.ln(5)
 
-    recent = data.tail(5)
-
     headers = ["Month", "Revenue", "Expenses", "Profit", "Cash Flow"]
     col_widths = [25, 40, 40, 35, 45]
 
@@ -165,12 +519,9 @@ def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
 
     # Table Rows
     pdf.set_font("Arial", "", 11)
-    for _, row in recent.iterrows():
-        pdf.cell(col_widths[0], 10, str(row["Month"]), border=1, align="C")
-        pdf.cell(col_widths[1], 10, f"{row['Revenue']:,}", border=1, align="C")
-        pdf.cell(col_widths[2], 10, f"{row['Expenses']:,}", border=1, align="C")
-        pdf.cell(col_widths[3], 10, f"{row['Profit']:,}", border=1, align="C")
-        pdf.cell(col_widths[4], 10, f"{row['Cash Flow']:,}", border=1, align="C")
+    for row in s["recent"]:
+        for width, value in zip(col_widths, row):
+            pdf.cell(width, 10, _pdf_text(value), border=1, align="C")
         pdf.ln()
 
     pdf.ln(10)
@@ -181,23 +532,58 @@ def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf"):
 
     pdf.set_font("Arial", "", 12)
 
-    if risk_level == "LOW RISK":
-        conclusion = "Business is financially stable. Focus on scaling, maintaining profit margin, and improving cash flow planning."
-    elif risk_level == "MEDIUM RISK":
-        conclusion = "Business is moderately stable. Expense control and receivable management are required for better stability."
-    else:
-        conclusion = "Business is under high risk. Immediate restructuring, cost optimization, and loan management is recommended."
-
     pdf.set_x(pdf.l_margin)
-    pdf.multi_cell(0, 8, conclusion)
+    pdf.multi_cell(0, 8, s["conclusion"])
+
+    # ---------------- Appendix (optional) ----------------
+    if "history" in s:
+        header, lines = s["history"]
+
+        pdf.add_page()
+        pdf.set_font("Arial", "B", 14)
+        pdf.cell(0, 10, f"Appendix) Full Financial History ({len(lines):,} rows)", ln=True)
+        pdf.ln(3)
+
+        _write_bulk_table(pdf, header, lines)
+
+    return _pdf_bytes(pdf)
+
+
+@timed()
+def build_pdf_report(data, risk_obj, include_history=False):
+    """Build the report and return the PDF bytes.
+
+    Sections whose inputs are unchanged come from the section cache; if no
+    section changed, the previously rendered document is returned as is.
+    include_history appends every row of `data` as a paginated table.
+    """
+    data = with_derived_columns(data)
+
+    names = [name for name in REPORT_SECTIONS
+             if name not in OPTIONAL_SECTIONS or (name == "history" and include_history)]
+    keys = {name: _section_key(name, data, risk_obj) for name in names}
+    document_key = tuple(keys.values())
+
+    document = _document_cache.get(document_key)
+    if document is not None:
+        increment("report.document_hit")
+        return document
+
+    sections = {name: _section(name, key, data, risk_obj) for name, key in keys.items()}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        document = _render_pdf(sections, scratch)
+
+    _document_cache.put(document_key, document)
+    return document
+
 
-    pdf.output(filename)
+@timed()
+def generate_pdf_report(data, risk_obj, filename="Financial_Report.pdf", include_history=False):
 
-    # Cleanup graph images
-    if os.path.exists("revenue_expense_profit.png"):
-        os.remove("revenue_expense_profit.png")
+    document = build_pdf_report(data, risk_obj, include_history)
 
-    if os.path.exists("cashflow.png"):
-        os.remove("cashflow.png")
+    with open(filename, "wb") as f:
+        f.write(document)
 
     return filename
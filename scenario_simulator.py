@@ -0,0 +1,133 @@
+import numpy as np
+from multiprocessing import Pool
+
+from forecasting_model import ForecastingModel
+
+
+BANKRUPTCY_LEVELS = ["LOW BANKRUPTCY RISK", "MODERATE BANKRUPTCY RISK", "HIGH BANKRUPTCY RISK"]
+
+
+class ScenarioSimulator:
+
+    def __init__(self, data, n_paths=10000, horizon=12, seed=None):
+        self.data = data
+        self.n_paths = n_paths
+        self.horizon = horizon
+        self.seed = seed
+
+    # Historical month-on-month volatility, used when no override is given
+    def _volatility(self, column):
+        vol = self.data[column].pct_change().std()
+        if np.isnan(vol):
+            return 0.0
+        return float(vol)
+
+    # Baseline levels: next-month forecast plus average EMI / tax rate
+    def baseline(self):
+
+        predicted_revenue, predicted_expense = ForecastingModel(self.data).predict_next_month()
+
+        revenue = self.data["Revenue"]
+        total_revenue = float(revenue.sum())
+        if not total_revenue > 0:
+            raise ValueError("Scenario simulation needs positive total revenue to derive the tax rate")
+
+        cash_flow = revenue - (self.data["Expenses"] + self.data["Loan EMI"] + self.data["Tax Paid"])
+
+        return {
+            "revenue": float(predicted_revenue),
+            "expenses": float(predicted_expense),
+            "loan_emi": float(self.data["Loan EMI"].mean()),
+            "tax_rate": float(self.data["Tax Paid"].sum()) / total_revenue,
+            "opening_cash": max(float(cash_flow.sum()), 0.0),
+            "revenue_volatility": self._volatility("Revenue"),
+            "expense_volatility": self._volatility("Expenses"),
+        }
+
+    # 🎲 Monte Carlo what-if run, all paths computed as (n_paths, horizon) arrays
+    def simulate(self, revenue_shock=0.0, expense_shock=0.0, emi_change=0.0,
+                 revenue_volatility=None, expense_volatility=None, opening_cash=None):
+
+        base = self.baseline()
+
+        if revenue_volatility is None:
+            revenue_volatility = base["revenue_volatility"]
+        if expense_volatility is None:
+            expense_volatility = base["expense_volatility"]
+        if opening_cash is None:
+            opening_cash = base["opening_cash"]
+
+        rng = np.random.default_rng(self.seed)
+        shape = (self.n_paths, self.horizon)
+
+        revenue = base["revenue"] * (1 + revenue_shock) * (1 + rng.normal(0.0, revenue_volatility, shape))
+        expenses = base["expenses"] * (1 + expense_shock) * (1 + rng.normal(0.0, expense_volatility, shape))
+        np.maximum(revenue, 0.0, out=revenue)
+        np.maximum(expenses, 0.0, out=expenses)
+
+        loan_emi = base["loan_emi"] * (1 + emi_change)
+        tax = base["tax_rate"] * revenue
+
+        # Same definition as the dashboard: Revenue - (Expenses + Loan EMI + Tax Paid)
+        cash_flow = revenue - (expenses + loan_emi + tax)
+        cash_balance = opening_cash + np.cumsum(cash_flow, axis=1)
+
+        # Runway: first month the cash balance goes negative (horizon if it never does)
+        negative = cash_balance < 0
+        survived = ~negative.any(axis=1)
+        runway = np.where(survived, self.horizon, negative.argmax(axis=1))
+
+        return {
+            "n_paths": self.n_paths,
+            "horizon": self.horizon,
+            "median_runway": float(np.median(runway)),
+            "p10_runway": float(np.percentile(runway, 10)),
+            "survival_probability": float(survived.mean()),
+            "prob_negative_cash_flow": float((cash_flow < 0).mean()),
+            "prob_negative_cash_flow_by_month": (cash_flow < 0).mean(axis=0).round(4).tolist(),
+            "expected_cash_flow": float(cash_flow.mean()),
+            "bankruptcy_risk": self._bankruptcy_distribution(revenue, expenses, loan_emi),
+        }
+
+    # Same scoring as RiskDetector.bankruptcy_risk, applied to every path at once
+    def _bankruptcy_distribution(self, revenue, expenses, loan_emi):
+
+        revenue_avg = revenue.mean(axis=1)
+        expense_avg = expenses.mean(axis=1)
+
+        # A path with no revenue fails both ratio checks
+        no_revenue = revenue_avg <= 0
+        safe_revenue = np.where(no_revenue, 1.0, revenue_avg)
+
+        profit = revenue_avg - expense_avg
+        expense_ratio = expense_avg / safe_revenue
+        loan_pressure = loan_emi / safe_revenue
+
+        risk_score = (
+            2 * (profit < 0)
+            + ((expense_ratio > 0.8) | no_revenue)
+            + ((loan_pressure > 0.5) | no_revenue)
+        )
+
+        levels = np.select([risk_score >= 3, risk_score == 2], [2, 1], default=0)
+        counts = np.bincount(levels, minlength=3) / len(levels)
+
+        return {label: float(share) for label, share in zip(BANKRUPTCY_LEVELS, counts)}
+
+
+def _simulate_company(args):
+    name, data, n_paths, horizon, seed, scenario = args
+    return name, ScenarioSimulator(data, n_paths, horizon, seed).simulate(**scenario)
+
+
+# Portfolio-wide run; companies is a {name: DataFrame} mapping.
+# processes=None uses every CPU, processes=1 runs in this process.
+def simulate_portfolio(companies, n_paths=10000, horizon=12, seed=None, processes=1, **scenario):
+
+    jobs = [(name, data, n_paths, horizon, seed, scenario) for name, data in companies.items()]
+
+    if processes == 1 or len(jobs) <= 1:
+        return dict(map(_simulate_company, jobs))
+
+    with Pool(processes) as pool:
+        return dict(pool.imap_unordered(_simulate_company, jobs))
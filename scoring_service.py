@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import instrumentation
+from instrumentation import stage_timer, increment
+from data_loader import DataLoader
+from pipeline import score_company, forecast_company, report_bytes
+
+
+DEFAULT_DATASET = "dataset/sme_financial_data.csv"
+
+
+# ------------------- Worker side -------------------
+# Each pool worker loads the dataset once and keeps it (and the results
+# computed on it) warm for the lifetime of the process. With a shared
+# dataset the workers attach to one published copy instead, and drop their
+# cached results whenever a new version is published.
+
+_worker_loader = None
+_worker_cache = {}
+
+
+def _init_worker(file_path, shared_name=None, instrumented=False):
+    global _worker_loader
+    instrumentation.enable(instrumented)
+    _worker_loader = DataLoader(file_path, compact=True, shared_name=shared_name)
+    _worker_loader.load_data()
+
+
+def _run_task(task, records=None):
+    # Stage timings recorded in the worker travel back with the result, so
+    # the parent's /metrics covers RiskDetector, forecasting and reports too
+    result = task(records)
+    return result, instrumentation.GLOBAL_RECORDER.drain()
+
+
+def _worker_data():
+    if _worker_loader.refresh():
+        _worker_cache.clear()
+    return _worker_loader.data
+
+
+def _resolve(records):
+    if records:
+        return pd.DataFrame(records)
+    return _worker_data()
+
+
+def _cached(name, records, compute):
+    if records:
+        return compute(_resolve(records))
+    data = _worker_data()
+    if name not in _worker_cache:
+        _worker_cache[name] = compute(data)
+    return _worker_cache[name]
+
+
+def score_task(records=None):
+    return _cached("score", records, score_company)
+
+
+def forecast_task(records=None):
+    return _cached("forecast", records, forecast_company)
+
+
+def report_task(records=None):
+    return _cached("report", records, report_bytes)
+
+
+# ------------------- Advisor -------------------
+
+def _make_advisor(data):
+    # Gemini advisor when an API key is configured, rule-based otherwise
+    if os.getenv("GEMINI_API_KEY"):
+        from final_detection import FinalFinancialAdvisor
+        advisor = FinalFinancialAdvisor(data)
+        return advisor.get_advice
+
+    from financial_chatbot import FinancialAdvisor
+    return FinancialAdvisor().get_advice
+
+
+# ------------------- Request validation -------------------
+
+_RISK_COLUMNS = ["Revenue", "Expenses", "Inventory", "Receivables", "Payables", "Loan EMI", "Tax Paid"]
+
+# Columns a caller-supplied `records` payload needs for each endpoint
+REQUIRED_COLUMNS = {
+    "/score": _RISK_COLUMNS,
+    "/forecast": ["Revenue", "Expenses"],
+    "/report": ["Month"] + _RISK_COLUMNS,
+    "/advice": [],
+}
+
+
+def validate_records(path, records):
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("'records' must be a list of objects")
+    if not records:
+        raise ValueError("'records' must not be empty; omit it to use the loaded dataset")
+
+    present = set().union(*records)
+    missing = [col for col in REQUIRED_COLUMNS[path] if col not in present]
+    if missing:
+        raise ValueError(f"'records' is missing required columns: {', '.join(missing)}")
+
+
+# ------------------- HTTP service -------------------
+
+class ScoringService:
+
+    TASKS = {
+        "/score": score_task,
+        "/forecast": forecast_task,
+        "/report": report_task,
+    }
+
+    def __init__(self, file_path=DEFAULT_DATASET, workers=None, shared_name=None):
+        self.file_path = file_path
+        self.workers = workers or os.cpu_count()
+
+        self.loader = DataLoader(file_path, shared_name=shared_name)
+        self.loader.load_data()
+        self.data = self.loader.data
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(file_path, shared_name, instrumentation.is_enabled())
+        )
+        self.advise = _make_advisor(self.data)
+
+    def warm_up(self):
+        # Best-effort priming of the worker-side caches for the default dataset
+        futures = [self.pool.submit(_run_task, task) for task in self.TASKS.values()
+                   for _ in range(self.workers)]
+        for future in futures:
+            if future.exception() is not None:
+                print("Warm-up failed:", future.exception())
+            else:
+                self._collect(future)
+
+    def _collect(self, future):
+        result, stats = future.result()
+        instrumentation.GLOBAL_RECORDER.merge(stats)
+        return result
+
+    def run(self, path, payload):
+        increment(f"service.requests{path}")
+        with stage_timer(f"service{path}"):
+            return self._run(path, payload)
+
+    def _run(self, path, payload):
+        if path not in REQUIRED_COLUMNS:
+            raise ValueError(f"Unknown endpoint: {path}")
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+
+        records = payload.get("records")
+        if records is not None:
+            validate_records(path, records)
+
+        if path == "/advice":
+            question = payload.get("question", "")
+            if not isinstance(question, str) or not question.strip():
+                raise ValueError("'question' is required")
+            if records:
+                return {"advice": _make_advisor(pd.DataFrame(records))(question.strip())}
+            if self.loader.refresh():
+                self.data = self.loader.data
+                self.advise = _make_advisor(self.data)
+            return {"advice": self.advise(question.strip())}
+
+        return self._collect(self.pool.submit(_run_task, self.TASKS[path], records))
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+def make_handler(service):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json"):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self, payload):
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+                return
+
+            if self.path == "/metrics":
+                body = instrumentation.export_prometheus().encode("utf-8")
+                self._send(200, body, "text/plain; version=0.0.4")
+                return
+
+            if self.path not in REQUIRED_COLUMNS:
+                self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+                return
+
+            try:
+                result = service.run(self.path, payload)
+            except ValueError as e:
+                increment("service.errors")
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                increment("service.errors")
+                self._send(500, {"error": str(e)})
+            else:
+                if isinstance(result, bytes):
+                    self._send(200, result, "application/pdf")
+                else:
+                    self._send(200, result)
+
+        def do_GET(self):
+            self._handle({})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                self._send(400, {"error": f"Invalid JSON: {e}"})
+                return
+            self._handle(payload)
+
+    return Handler
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless SME financial scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data", default=DEFAULT_DATASET)
+    parser.add_argument("--shared", default=os.getenv("SME_SHARED_DATASET"),
+                        help="Attach to a dataset published by shared_dataset.py instead of reading --data")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="Disable stage timings exported on /metrics")
+    args = parser.parse_args()
+
+    instrumentation.enable(not args.no_metrics)
+
+    service = ScoringService(args.data, args.workers, args.shared)
+    service.warm_up()
+
+    server = ScoringHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Scoring service listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from ledger import Ledger
+
+
+DEFAULT_NAME = "sme_dataset"
+_ALIGN = 64
+
+
+def manifest_path(name, manifest_dir=None):
+    return os.path.join(manifest_dir or tempfile.gettempdir(), f"{name}.manifest.json")
+
+
+def _read_manifest(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Every block starts with a header (magic, version, size), checked by readers
+# so a missing or recycled block is never mistaken for the published one
+_HEADER = np.dtype([("magic", "S8"), ("version", "<u8"), ("size", "<u8")])
+_MAGIC = b"SMEDATA1"
+_SHM_DIR = "/dev/shm"
+
+
+def _map_block(block, size):
+    """Read-only mapping of a published block.
+
+    The pages are mapped PROT_READ / ACCESS_READ, so a reader cannot write
+    into the dataset other workers see. Arrays built on the mapping with
+    np.frombuffer keep it alive; it is unmapped once the last one is gone.
+    """
+    if os.path.isdir(_SHM_DIR):
+        # Linux: POSIX shared memory objects are files under /dev/shm
+        fd = os.open(os.path.join(_SHM_DIR, block), os.O_RDONLY)
+        try:
+            if os.fstat(fd).st_size < size:
+                raise RuntimeError(f"Shared block {block} is smaller than its manifest says")
+            return mmap.mmap(fd, size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+
+    if os.name == "nt":
+        # Opening a name that no longer exists creates an empty mapping; the
+        # header check in _check_header() turns that into FileNotFoundError
+        return mmap.mmap(-1, size, tagname=block, access=mmap.ACCESS_READ)
+
+    raise RuntimeError("Shared datasets need /dev/shm (Linux) or Windows named shared memory")
+
+
+def _check_header(mapping, block, manifest):
+    header = np.frombuffer(mapping, dtype=_HEADER, count=1)[0]
+    if header["magic"] != _MAGIC or int(header["version"]) != manifest["version"]:
+        raise FileNotFoundError(f"Shared block {block} is not version {manifest['version']}")
+    if int(header["size"]) != manifest["size"]:
+        raise RuntimeError(f"Shared block {block} does not match its manifest size")
+
+
+# ------------------- Publisher -------------------
+
+class SharedDatasetPublisher:
+    """Publishes a columnar dataset into one shared-memory block per version.
+
+    The manifest file (block name, version, column layout, categories) is
+    replaced atomically on every publish, so readers always see a complete
+    version. The previous block is unlinked right after the swap; readers
+    still attached to it keep their mapping until they move on.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, manifest_dir=None):
+        self.name = name
+        self.manifest = manifest_path(name, manifest_dir)
+        self.version = 0
+        self._block = None
+
+        if os.path.exists(self.manifest):
+            self.version = _read_manifest(self.manifest)["version"]
+
+    def publish(self, data):
+        ledger = data if isinstance(data, Ledger) else Ledger.from_frame(data)
+
+        # Column layout: raw arrays and categorical codes, each 64-byte aligned
+        columns, buffers, offset = [], [], _HEADER.itemsize
+        for col in ledger.columns:
+            if col not in ledger._arrays and col not in ledger._labels:
+                continue  # derived columns stay lazy on the reader side
+
+            if col in ledger._labels:
+                categorical = ledger._labels[col]
+                values = np.ascontiguousarray(categorical.codes)
+                entry = {"name": col, "kind": "categorical",
+                         "categories": [str(c) for c in categorical.categories]}
+            else:
+                values = np.ascontiguousarray(ledger._arrays[col])
+                entry = {"name": col, "kind": "array"}
+
+            offset = -(-offset // _ALIGN) * _ALIGN
+            entry.update({"dtype": values.dtype.str, "offset": offset, "length": len(values)})
+            columns.append(entry)
+            buffers.append((offset, values))
+            offset += values.nbytes
+
+        version = self.version + 1
+        size = offset
+        block = SharedMemory(name=f"{self.name}_v{version}_{os.getpid()}", create=True, size=size)
+        np.ndarray((1,), dtype=_HEADER, buffer=block.buf)[0] = (_MAGIC, version, size)
+
+        for start, values in buffers:
+            target = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf, offset=start)
+            target[:] = values
+
+        manifest = {
+            "name": self.name,
+            "version": version,
+            "block": block.name,
+            "size": size,
+            "length": len(ledger),
+            "columns": columns,
+            "published": time.time(),
+        }
+
+        tmp = self.manifest + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.manifest)
+
+        previous, self._block = self._block, block
+        self.version = version
+
+        if previous is not None:
+            previous.close()
+            previous.unlink()
+
+        return version
+
+    def close(self):
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+        if os.path.exists(self.manifest):
+            os.remove(self.manifest)
+
+
+# ------------------- Reader -------------------
+
+class SharedDataset:
+    """Read-only, zero-copy view of a published dataset.
+
+    `ledger` is a Ledger whose columns are read-only NumPy arrays over the
+    shared block. current() re-checks the manifest and swaps to a newer
+    version when one has been published; a previous version stays mapped
+    while any Ledger built on it is alive.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, manifest_dir=None):
+        self.manifest = manifest_path(name, manifest_dir)
+        self.version = None
+        self.ledger = None
+        self._manifest_mtime = None
+        self._lock = threading.Lock()
+
+        self.refresh()
+
+    def refresh(self, retries=5):
+        """Attach to the newest version. Returns True when a new version was attached."""
+        with self._lock:
+            return self._refresh(retries)
+
+    def _refresh(self, retries):
+        for attempt in range(retries):
+            mtime = os.stat(self.manifest).st_mtime_ns
+            if mtime == self._manifest_mtime:
+                return False
+
+            manifest = _read_manifest(self.manifest)
+            if manifest["version"] == self.version:
+                self._manifest_mtime = mtime
+                return False
+
+            try:
+                block = _map_block(manifest["block"], manifest["size"])
+                _check_header(block, manifest["block"], manifest)
+            except FileNotFoundError:
+                # Superseded between reading the manifest and attaching
+                time.sleep(0.05 * (attempt + 1))
+                continue
+
+            self._swap(block, manifest)
+            self._manifest_mtime = mtime
+            return True
+
+        raise RuntimeError(f"Could not attach to shared dataset at {self.manifest}")
+
+    def _swap(self, block, manifest):
+        arrays, labels, order = {}, {}, []
+        for entry in manifest["columns"]:
+            values = np.frombuffer(block, dtype=np.dtype(entry["dtype"]),
+                                   count=entry["length"], offset=entry["offset"])
+
+            if entry["kind"] == "categorical":
+                labels[entry["name"]] = pd.Categorical.from_codes(values, entry["categories"])
+            else:
+                arrays[entry["name"]] = values
+            order.append(entry["name"])
+
+        self.ledger = Ledger(arrays, labels, order)
+        self.version = manifest["version"]
+
+    def current(self):
+        self.refresh()
+        return self.ledger
+
+
+def attach(name=DEFAULT_NAME, manifest_dir=None):
+    return SharedDataset(name, manifest_dir)
+
+
+# ------------------- Dataset server -------------------
+
+def serve(file_path, name=DEFAULT_NAME, manifest_dir=None, poll_interval=5.0):
+    """Publish `file_path` and republish a new version whenever it changes."""
+    publisher = SharedDatasetPublisher(name, manifest_dir)
+    last_mtime = None
+
+    try:
+        while True:
+            mtime = os.stat(file_path).st_mtime_ns
+            if mtime != last_mtime:
+                ledger = Ledger.from_csv(file_path)
+                version = publisher.publish(ledger)
+                last_mtime = mtime
+                print(f"Published {file_path} as {name} v{version} "
+                      f"({len(ledger)} rows, {ledger.memory_usage() / 1e6:.1f} MB)")
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-memory dataset server for dashboard / scoring workers")
+    parser.add_argument("--input", default="dataset/sme_financial_data.csv")
+    parser.add_argument("--name", default=DEFAULT_NAME)
+    parser.add_argument("--manifest-dir", default=None)
+    parser.add_argument("--poll", type=float, default=5.0, help="Seconds between checks for a new input file")
+    args = parser.parse_args()
+
+    serve(args.input, args.name, args.manifest_dir, args.poll)
+
+
+if __name__ == "__main__":
+    main()
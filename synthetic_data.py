@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ["Month", "Revenue", "Expenses", "Inventory", "Receivables", "Payables", "Loan EMI", "Tax Paid"]
+
+
+def generate_sme_data(n_rows, n_companies=1, start="2015-01", seed=0):
+    """Generate a synthetic SME ledger with the dataset/sme_financial_data.csv schema.
+
+    Rows are split evenly across companies (contiguous, one row per month).
+    A "Company" column is added when n_companies > 1.
+    """
+    rng = np.random.default_rng(seed)
+
+    n_companies = max(1, min(n_companies, n_rows))
+    months_per_company = -(-n_rows // n_companies)
+
+    company_ids = np.repeat(np.arange(n_companies), months_per_company)[:n_rows]
+    month_index = np.tile(np.arange(months_per_company), n_companies)[:n_rows]
+
+    # Company-level scale and trend, month-level noise. Growth stops compounding
+    # after 20 years so very long single-company histories stay in range.
+    scale = rng.uniform(200000, 1500000, n_companies)[company_ids]
+    trend = rng.normal(0.005, 0.01, n_companies)[company_ids]
+    growth = (1 + trend) ** np.minimum(month_index, 240)
+    revenue = scale * growth * rng.normal(1.0, 0.08, n_rows)
+    revenue = np.maximum(revenue, 1000)
+
+    expense_ratio = rng.uniform(0.45, 0.9, n_companies)[company_ids]
+    expenses = revenue * expense_ratio * rng.normal(1.0, 0.05, n_rows)
+
+    periods = pd.period_range(start=start, periods=months_per_company, freq="M").strftime("%Y-%m")
+
+    data = pd.DataFrame({
+        "Month": np.asarray(periods, dtype=object)[month_index],
+        "Revenue": revenue.astype(np.int64),
+        "Expenses": expenses.astype(np.int64),
+        "Inventory": (revenue * rng.uniform(0.2, 0.6, n_rows)).astype(np.int64),
+        "Receivables": (revenue * rng.uniform(0.1, 0.5, n_rows)).astype(np.int64),
+        "Payables": (expenses * rng.uniform(0.1, 0.5, n_rows)).astype(np.int64),
+        "Loan EMI": (scale * rng.uniform(0.05, 0.35, n_companies)[company_ids]).astype(np.int64),
+        "Tax Paid": (revenue * rng.uniform(0.03, 0.08, n_rows)).astype(np.int64),
+    })
+
+    if n_companies > 1:
+        data.insert(0, "Company", pd.Series(company_ids).map("SME-{:06d}".format).to_numpy())
+
+    return data
@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_runner import CHECKPOINT_FILE, Checkpoint, forecast_job, run
+from synthetic_data import generate_sme_data
+
+
+def _portfolio(tmp_path, n_companies=6, months=12):
+    data = generate_sme_data(n_companies * months, n_companies)
+    path = tmp_path / "portfolio.csv"
+    data.to_csv(path, index=False)
+    return data, path
+
+
+def _read_parts(output_dir):
+    parts = sorted(n for n in os.listdir(output_dir) if n.startswith("part-"))
+    return pd.concat([pd.read_csv(os.path.join(output_dir, p)) for p in parts], ignore_index=True)
+
+
+def test_bad_company_is_reported_and_the_run_continues(tmp_path):
+    data, path = _portfolio(tmp_path)
+    bad = data["Company"].unique()[2]
+    data.loc[data["Company"] == bad, "Revenue"] = np.nan
+    data.to_csv(path, index=False)
+
+    output = tmp_path / "out"
+    run("forecast", path, output, workers=2, batch_size=4)
+
+    results = _read_parts(output).set_index("company")
+    assert len(results) == data["Company"].nunique()
+    assert results.loc[bad, "error"].startswith("ValueError")
+    assert results.drop(index=bad)["error"].isna().all()
+    assert results.drop(index=bad)["predicted_revenue"].notna().all()
+
+
+def test_job_error_keeps_company(tmp_path):
+    rows = generate_sme_data(12)
+    rows["Revenue"] = np.nan
+    result = forecast_job(("SME-X", rows, str(tmp_path)))
+    assert result["company"] == "SME-X"
+    assert "NaN" in result["error"]
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    path = tmp_path / CHECKPOINT_FILE
+    good = json.dumps({"part": "part-00000.csv", "companies": ["A", "B"]}) + "\n"
+    path.write_text(good + '{"part": "part-00001.csv", "compa')
+
+    checkpoint = Checkpoint(str(tmp_path))
+    assert checkpoint.parts == ["part-00000.csv"]
+    assert checkpoint.done == {"A", "B"}
+    assert path.read_text() == good
+
+    checkpoint.record("part-00001.csv", ["C"])
+    reloaded = Checkpoint(str(tmp_path))
+    assert reloaded.parts == ["part-00000.csv", "part-00001.csv"]
+    assert reloaded.done == {"A", "B", "C"}
+
+
+def test_next_index_skips_recorded_and_orphan_parts(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path))
+    assert checkpoint.next_index() == 0
+
+    checkpoint.record("part-00000.csv", ["A"])
+    checkpoint.record("part-00003.csv", ["B"])
+    assert checkpoint.next_index() == 4
+
+    (tmp_path / "part-00007.csv").write_text("company\nC\n")
+    assert checkpoint.next_index() == 8
+
+
+def test_resume_after_torn_checkpoint(tmp_path):
+    data, path = _portfolio(tmp_path)
+    output = tmp_path / "out"
+    run("forecast", path, output, workers=1, batch_size=2)
+
+    # Simulate a crash while the last entry was being written
+    checkpoint = output / CHECKPOINT_FILE
+    lines = checkpoint.read_text().splitlines(keepends=True)
+    checkpoint.write_text("".join(lines[:-1]) + lines[-1][:10])
+
+    run("forecast", path, output, workers=1, batch_size=2)
+
+    results = _read_parts(output)
+    assert sorted(results["company"]) == sorted(data["Company"].unique())
+    assert Checkpoint(str(output)).done == set(data["Company"].unique())
@@ -0,0 +1,120 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+DAYS_IN_MONTH = 30
+WORKING_CAPITAL_COLUMNS = ["DSO", "DIO", "DPO", "CCC"]
+REQUIRED_COLUMNS = ["Revenue", "Expenses", "Inventory", "Receivables", "Payables"]
+
+
+def _ratio_days(numerator, denominator, days):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out * days
+
+
+def working_capital_metrics(data, days=DAYS_IN_MONTH):
+    """Monthly DSO, DIO, DPO and cash conversion cycle for a DataFrame or Ledger.
+
+    Expenses stand in for cost of goods sold, so DIO and DPO are measured
+    against monthly Expenses. Months with no revenue / expenses give NaN.
+    """
+    dso = _ratio_days(data["Receivables"], data["Revenue"], days)
+    dio = _ratio_days(data["Inventory"], data["Expenses"], days)
+    dpo = _ratio_days(data["Payables"], data["Expenses"], days)
+
+    return pd.DataFrame({"DSO": dso, "DIO": dio, "DPO": dpo, "CCC": dso + dio - dpo})
+
+
+def working_capital_summary(data, days=DAYS_IN_MONTH):
+    """Average DSO / DIO / DPO / CCC plus the recent CCC trend, or None when the
+    ledger lacks the inventory / receivables / payables columns."""
+    if any(col not in data.columns for col in REQUIRED_COLUMNS) or len(data) == 0:
+        return None
+
+    metrics = working_capital_metrics(data, days)
+    ccc = metrics["CCC"].dropna()
+    if ccc.empty:
+        return None
+
+    # Trend: last quarter's average CCC against the one before it
+    recent = ccc.tail(3).mean()
+    previous = ccc.iloc[-6:-3].mean() if len(ccc) >= 6 else np.nan
+
+    summary = {col: float(metrics[col].mean()) for col in WORKING_CAPITAL_COLUMNS}
+    summary["CCC_trend"] = None if np.isnan(previous) else float(recent - previous)
+    return summary
+
+
+# ------------------- Streaming stage -------------------
+
+def iter_working_capital(chunks, window=3, company_column="Company", days=DAYS_IN_MONTH):
+    """Generator stage: per-month working-capital metrics over chunked input.
+
+    `chunks` is any iterable of DataFrames (e.g. pd.read_csv(..., chunksize=N)).
+    Rows must be in month order within each company. Rolling means and trends
+    carry across chunk boundaries; only the last `window` rows per company are
+    kept between chunks, so memory stays bounded for multi-year ledgers.
+    """
+    carry = None
+
+    for chunk in chunks:
+        if company_column in chunk.columns:
+            keys = chunk[company_column].to_numpy()
+        else:
+            keys = np.zeros(len(chunk), dtype=np.int8)
+
+        metrics = working_capital_metrics(chunk, days)
+        metrics.insert(0, "_key", keys)
+        metrics.insert(1, "Month", chunk["Month"].to_numpy())
+        metrics["_new"] = True
+
+        frame = metrics if carry is None else pd.concat([carry, metrics], ignore_index=True)
+        grouped = frame.groupby("_key", sort=False)
+
+        rolling = grouped[WORKING_CAPITAL_COLUMNS].rolling(window, min_periods=1).mean()
+        rolling = rolling.reset_index(level=0, drop=True).sort_index()
+        for col in WORKING_CAPITAL_COLUMNS:
+            frame[f"{col}_rolling"] = rolling[col]
+        frame["CCC_trend"] = frame.groupby("_key", sort=False)["CCC_rolling"].diff()
+
+        carry = frame.groupby("_key", sort=False).tail(window)[["_key", "Month"] + WORKING_CAPITAL_COLUMNS]
+        carry = carry.assign(_new=False)
+
+        out = frame[frame["_new"]].drop(columns="_new").reset_index(drop=True)
+        if company_column in chunk.columns:
+            out = out.rename(columns={"_key": company_column})
+        else:
+            out = out.drop(columns="_key")
+
+        yield out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming working-capital (DSO/DIO/DPO/CCC) engine")
+    parser.add_argument("--input", default="dataset/sme_financial_data.csv")
+    parser.add_argument("--output", default="working_capital.csv")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--window", type=int, default=3, help="Rolling window in months")
+    parser.add_argument("--company-column", default="Company")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        os.remove(args.output)
+
+    rows = 0
+    chunks = pd.read_csv(args.input, chunksize=args.chunksize)
+    for i, result in enumerate(iter_working_capital(chunks, args.window, args.company_column)):
+        result.to_csv(args.output, mode="a", header=(i == 0), index=False)
+        rows += len(result)
+
+    print(f"Wrote {rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()